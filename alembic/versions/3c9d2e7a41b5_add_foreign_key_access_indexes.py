@@ -0,0 +1,47 @@
+"""add foreign key access indexes
+
+Revision ID: 3c9d2e7a41b5
+Revises: f8479994c8d6
+Create Date: 2026-10-18 10:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2e7a41b5'
+down_revision: Union[str, Sequence[str], None] = 'f8479994c8d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns) -- shaped after the WHERE/ORDER BY of the crud queries
+INDEXES = [
+    ('ix_stores_owner_id', 'stores', ['owner_id']),
+    ('ix_customers_store_id_id', 'customers', ['store_id', 'id']),
+    ('ix_customers_store_id_phone', 'customers', ['store_id', 'phone']),
+    ('ix_customers_phone', 'customers', ['phone']),
+    ('ix_orders_store_id_id', 'orders', ['store_id', 'id']),
+    ('ix_orders_store_id_created_at_id', 'orders', ['store_id', 'created_at', 'id']),
+    ('ix_orders_customer_id_id', 'orders', ['customer_id', 'id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_product_id', 'order_items', ['product_id']),
+    ('ix_inquiries_store_id_id', 'inquiries', ['store_id', 'id']),
+    ('ix_inquiries_customer_id_id', 'inquiries', ['customer_id', 'id']),
+    ('ix_offers_store_id_id', 'offers', ['store_id', 'id']),
+    ('ix_offers_store_id_valid_until', 'offers', ['store_id', 'valid_until']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
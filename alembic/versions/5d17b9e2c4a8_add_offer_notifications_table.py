@@ -0,0 +1,47 @@
+"""add offer notifications table
+
+Revision ID: 5d17b9e2c4a8
+Revises: 8a41f0c3d2e6
+Create Date: 2026-10-18 12:41:09.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d17b9e2c4a8'
+down_revision: Union[str, Sequence[str], None] = '8a41f0c3d2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('offer_notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('offer_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=True),
+    sa.Column('sent', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('last_customer_id', sa.Integer(), nullable=False),
+    sa.Column('messages_per_second', sa.Float(), nullable=True),
+    sa.Column('error', sa.String(length=1000), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['offer_id'], ['offers.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_offer_notifications_id'), 'offer_notifications', ['id'], unique=False)
+    op.create_index('ix_offer_notifications_offer_id', 'offer_notifications', ['offer_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_offer_notifications_offer_id', table_name='offer_notifications')
+    op.drop_index(op.f('ix_offer_notifications_id'), table_name='offer_notifications')
+    op.drop_table('offer_notifications')
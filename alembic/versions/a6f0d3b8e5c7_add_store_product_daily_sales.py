@@ -0,0 +1,48 @@
+"""add store product daily sales
+
+Revision ID: a6f0d3b8e5c7
+Revises: e2c84f6a9b13
+Create Date: 2026-10-18 14:48:12.907655
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f0d3b8e5c7'
+down_revision: Union[str, Sequence[str], None] = 'e2c84f6a9b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('store_product_daily_sales',
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('store_id', 'day', 'product_id')
+    )
+    # populate from existing orders (same statement as python -m app.utils.sales_rollup)
+    op.execute(
+        """
+        INSERT INTO store_product_daily_sales (store_id, day, product_id, quantity, revenue)
+        SELECT o.store_id, DATE(o.created_at), i.product_id, SUM(i.quantity), SUM(i.quantity * i.price)
+        FROM orders o
+        JOIN order_items i ON i.order_id = o.id
+        WHERE COALESCE(o.status, '') NOT IN ('Cancelled')
+        GROUP BY o.store_id, DATE(o.created_at), i.product_id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('store_product_daily_sales')
@@ -0,0 +1,43 @@
+"""move otps to otp_codes table
+
+Revision ID: b7e3a9d51f20
+Revises: 5d17b9e2c4a8
+Create Date: 2026-10-18 13:27:44.802113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3a9d51f20'
+down_revision: Union[str, Sequence[str], None] = '5d17b9e2c4a8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('otp_codes',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('code_hash', sa.String(length=64), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('window_started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+    op.create_index('ix_otp_codes_expires_at', 'otp_codes', ['expires_at'], unique=False)
+    # pending OTPs are short-lived; they are not carried over
+    op.drop_column('owners', 'otp_expires_at')
+    op.drop_column('owners', 'otp_code')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('owners', sa.Column('otp_code', sa.String(length=6), nullable=True))
+    op.add_column('owners', sa.Column('otp_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index('ix_otp_codes_expires_at', table_name='otp_codes')
+    op.drop_table('otp_codes')
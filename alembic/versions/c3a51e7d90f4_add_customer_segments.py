@@ -0,0 +1,48 @@
+"""add customer segments
+
+Revision ID: c3a51e7d90f4
+Revises: a6f0d3b8e5c7
+Create Date: 2026-10-18 15:32:40.118734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3a51e7d90f4'
+down_revision: Union[str, Sequence[str], None] = 'a6f0d3b8e5c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('customer_segments',
+    sa.Column('customer_id', sa.Integer(), nullable=False),
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('recency_days', sa.Integer(), nullable=False),
+    sa.Column('frequency', sa.Integer(), nullable=False),
+    sa.Column('monetary', sa.Float(), nullable=False),
+    sa.Column('r_score', sa.Integer(), nullable=False),
+    sa.Column('f_score', sa.Integer(), nullable=False),
+    sa.Column('m_score', sa.Integer(), nullable=False),
+    sa.Column('segment', sa.String(length=20), nullable=False),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['customer_id'], ['customers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('customer_id')
+    )
+    op.create_index('ix_customer_segments_store_id_segment', 'customer_segments', ['store_id', 'segment', 'customer_id'], unique=False)
+    op.create_index('ix_customer_segments_segment_customer_id', 'customer_segments', ['segment', 'customer_id'], unique=False)
+    op.add_column('offers', sa.Column('segment', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('offers', 'segment')
+    op.drop_index('ix_customer_segments_segment_customer_id', table_name='customer_segments')
+    op.drop_index('ix_customer_segments_store_id_segment', table_name='customer_segments')
+    op.drop_table('customer_segments')
@@ -0,0 +1,76 @@
+"""add customer search columns
+
+Revision ID: d8b2f4c61a37
+Revises: c3a51e7d90f4
+Create Date: 2026-10-18 16:10:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.phone import normalize_phone, reverse_phone
+
+BATCH_SIZE = 5000
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b2f4c61a37'
+down_revision: Union[str, Sequence[str], None] = 'c3a51e7d90f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('customers', sa.Column('name_lower', sa.String(length=100), nullable=True))
+    op.add_column('customers', sa.Column('phone_normalized', sa.String(length=15), nullable=True))
+    op.add_column('customers', sa.Column('phone_reversed', sa.String(length=15), nullable=True))
+    op.execute("UPDATE customers SET name_lower = LOWER(name)")
+    _backfill_phones()
+    op.create_index('ix_customers_store_id_name_lower', 'customers', ['store_id', 'name_lower'], unique=False)
+    op.create_index('ix_customers_store_id_phone_normalized', 'customers', ['store_id', 'phone_normalized'], unique=False)
+    op.create_index('ix_customers_store_id_phone_reversed', 'customers', ['store_id', 'phone_reversed'], unique=False)
+
+
+def _backfill_phones():
+    """
+    Fill the phone search columns in keyset batches with app.utils.phone, the normalizer the
+    model and the search use; in Python because REGEXP_REPLACE / REVERSE are not portable.
+    """
+    conn = op.get_bind()
+    customers = sa.table(
+        'customers', sa.column('id', sa.Integer), sa.column('phone', sa.String),
+        sa.column('phone_normalized', sa.String), sa.column('phone_reversed', sa.String),
+    )
+    fill = (
+        customers.update()
+        .where(customers.c.id == sa.bindparam('row_id'))
+        .values(phone_normalized=sa.bindparam('normalized'), phone_reversed=sa.bindparam('reversed'))
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(customers.c.id, customers.c.phone)
+            .where(customers.c.id > last_id, customers.c.phone.isnot(None))
+            .order_by(customers.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        conn.execute(fill, [
+            {'row_id': row_id, 'normalized': normalize_phone(phone), 'reversed': reverse_phone(phone)}
+            for row_id, phone in rows
+        ])
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_customers_store_id_phone_reversed', table_name='customers')
+    op.drop_index('ix_customers_store_id_phone_normalized', table_name='customers')
+    op.drop_index('ix_customers_store_id_name_lower', table_name='customers')
+    op.drop_column('customers', 'phone_reversed')
+    op.drop_column('customers', 'phone_normalized')
+    op.drop_column('customers', 'name_lower')
@@ -0,0 +1,48 @@
+"""add store daily sales rollup
+
+Revision ID: e2c84f6a9b13
+Revises: b7e3a9d51f20
+Create Date: 2026-10-18 14:05:51.640372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c84f6a9b13'
+down_revision: Union[str, Sequence[str], None] = 'b7e3a9d51f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('store_daily_sales',
+    sa.Column('store_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('orders', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('items', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['store_id'], ['stores.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('store_id', 'day')
+    )
+    # populate from existing orders (same statement as python -m app.utils.sales_rollup)
+    op.execute(
+        """
+        INSERT INTO store_daily_sales (store_id, day, orders, revenue, items)
+        SELECT o.store_id, DATE(o.created_at), COUNT(*), COALESCE(SUM(o.total), 0), COALESCE(SUM(i.items), 0)
+        FROM orders o
+        LEFT JOIN (SELECT order_id, SUM(quantity) AS items FROM order_items GROUP BY order_id) i
+            ON i.order_id = o.id
+        WHERE COALESCE(o.status, '') NOT IN ('Cancelled')
+        GROUP BY o.store_id, DATE(o.created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('store_daily_sales')
@@ -0,0 +1,33 @@
+"""add resource versions
+
+Revision ID: f1c7a2e94b56
+Revises: d8b2f4c61a37
+Create Date: 2026-10-18 17:05:12.482913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a2e94b56'
+down_revision: Union[str, Sequence[str], None] = 'd8b2f4c61a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('resource_versions',
+    sa.Column('scope', sa.String(length=30), nullable=False),
+    sa.Column('resource_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('scope', 'resource_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resource_versions')
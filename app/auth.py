@@ -4,6 +4,8 @@ from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from app import crud, database
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.utils import resource_versions
+from app.utils.principal_cache import Principal, owner_principal, principal_cache, storeman_principal
 
 SECRET_KEY = "your-secret-key"
 ALGORITHM = "HS256"
@@ -19,40 +21,106 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-# Get current owner from token
-def get_current_owner(
-    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(database.get_db)
-):
+# Decode token and return the user id, checking the expected role
+def _decode_token(token: HTTPAuthorizationCredentials, expected_role: str) -> int:
     try:
         payload = jwt.decode(token.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         role: str = payload.get("role")
-        if not user_id or role != "owner":
+        if not user_id or role != expected_role:
             raise HTTPException(status_code=401, detail="Invalid token or role")
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    return int(user_id)
+
+def _stores_version(db: Session, owner_id: int) -> int:
+    return resource_versions.get_version(db, resource_versions.STORES, owner_id)
 
-    owner = crud.get_owner_by_id(db, int(user_id))
+def _load_owner(db: Session, owner_id: int) -> Principal:
+    # version first: a change landing in between makes the entry look stale, never fresh
+    stores_version = _stores_version(db, owner_id)
+    owner = crud.get_owner_by_id(db, owner_id)
     if not owner:
         raise HTTPException(status_code=404, detail="Owner not found")
-    return owner
+    principal = owner_principal(owner, crud.get_store_ids_by_owner(db, owner_id), stores_version)
+    principal_cache.put(principal)
+    return principal
+
+# Cached owner, trusted only while their STORES version is unchanged: other processes transfer
+# and delete stores (or the owner) without reaching this process's cache
+def _current_owner(db: Session, owner_id: int) -> Principal:
+    principal = principal_cache.get("owner", owner_id)
+    if principal is not None and _stores_version(db, owner_id) == principal.stores_version:
+        return principal
+    return _load_owner(db, owner_id)
+
+def _load_storeman(db: Session, storeman_id: int) -> Principal:
+    storeman = crud.get_storeman_by_id(db, storeman_id)
+    if not storeman:
+        raise HTTPException(status_code=404, detail="Storeman not found")
+    principal = storeman_principal(storeman)
+    principal_cache.put(principal)
+    return principal
+
+# Get current owner from token
+def get_current_owner(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db: Session = Depends(database.get_db)
+) -> Principal:
+    owner_id = _decode_token(token, "owner")
+    return _current_owner(db, owner_id)
 
 # Get current storeman from token
 def get_current_storeman(
     token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
     db: Session = Depends(database.get_db)
-):
-    try:
-        payload = jwt.decode(token.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        role: str = payload.get("role")
-        if not user_id or role != "storeman":
-            raise HTTPException(status_code=401, detail="Invalid token or role")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Invalid token")
+) -> Principal:
+    storeman_id = _decode_token(token, "storeman")
+    return principal_cache.get("storeman", storeman_id) or _load_storeman(db, storeman_id)
 
-    storeman = crud.get_storeman_by_id(db, int(user_id))
-    if not storeman:
-        raise HTTPException(status_code=404, detail="Storeman not found")
-    return storeman
+# Raise 403 unless store_id belongs to the owner. Answered from the cached principal; only an
+# unknown store id re-reads the owner's stores (e.g. a store just created by another process).
+def ensure_store_access(db: Session, owner: Principal, store_id: int,
+                        detail: str = "Store not found or not owned by you") -> Principal:
+    if store_id in owner.store_ids:
+        return owner
+    owner = _load_owner(db, owner.id)
+    if store_id not in owner.store_ids:
+        raise HTTPException(status_code=403, detail=detail)
+    return owner
+
+# Dependency for endpoints with a store_id path/query parameter
+def get_store_owner(
+    store_id: int,
+    current_owner: Principal = Depends(get_current_owner),
+    db: Session = Depends(database.get_db)
+) -> Principal:
+    return ensure_store_access(db, current_owner, store_id)
+
+# Async variants used by the async routers (DB_MODE=async)
+async def get_current_owner_async(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db = Depends(database.get_async_db)
+) -> Principal:
+    owner_id = _decode_token(token, "owner")
+    return await db.run_sync(_current_owner, owner_id)
+
+async def get_current_storeman_async(
+    token: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
+    db = Depends(database.get_async_db)
+) -> Principal:
+    storeman_id = _decode_token(token, "storeman")
+    return principal_cache.get("storeman", storeman_id) or await db.run_sync(_load_storeman, storeman_id)
+
+async def ensure_store_access_async(db, owner: Principal, store_id: int,
+                                    detail: str = "Store not found or not owned by you") -> Principal:
+    if store_id in owner.store_ids:
+        return owner
+    return await db.run_sync(ensure_store_access, owner, store_id, detail)
+
+async def get_store_owner_async(
+    store_id: int,
+    current_owner: Principal = Depends(get_current_owner_async),
+    db = Depends(database.get_async_db)
+) -> Principal:
+    return await ensure_store_access_async(db, current_owner, store_id)
@@ -3,8 +3,63 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+def _async_url(url: str):
+    """Map a sync driver URL onto its asyncio driver (pymysql -> aiomysql, sqlite -> aiosqlite)."""
+    if not url:
+        return url
+    if url.startswith("mysql+pymysql://") or url.startswith("mysql://"):
+        return "mysql+aiomysql://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://") and not url.startswith("sqlite+"):
+        return "sqlite+aiosqlite://" + url.split("://", 1)[1]
+    return url
+
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # "sync" (default) or "async": async mode serves the hot routers from an AsyncEngine
+    DB_MODE: str = os.getenv("DB_MODE", "sync").lower()
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL)
+    # Comma-separated read replica URLs; read-only endpoints are routed to them when set
+    DATABASE_REPLICA_URLS: list = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+    REPLICA_CHECK_INTERVAL_SECONDS: float = float(os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", 10))
+    # After a client writes, its reads stay on the primary for this long (read-your-writes)
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+    # Rows per chunk (and per commit) for the streaming customer import
+    IMPORT_CHUNK_SIZE: int = int(os.getenv("IMPORT_CHUNK_SIZE", 5000))
+    # Background jobs: worker threads per app process (0 disables), CPU processes for PDF/XLSX work
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 2))
+    JOB_PROCESSES: int = int(os.getenv("JOB_PROCESSES", os.cpu_count() or 1))
+    JOB_POLL_SECONDS: float = float(os.getenv("JOB_POLL_SECONDS", 1.0))
+    # A running job whose lease is older than this is assumed dead and picked up again
+    JOB_LEASE_SECONDS: int = int(os.getenv("JOB_LEASE_SECONDS", 300))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    # Upper bound for the on-disk invoice PDF cache
+    INVOICE_CACHE_MAX_BYTES: int = int(os.getenv("INVOICE_CACHE_MAX_MB", 512)) * 1024 * 1024
+    # Offer SMS fan-out
+    SMS_PROVIDER: str = os.getenv("SMS_PROVIDER", "log")
+    SMS_LOG_PATH: str = os.getenv("SMS_LOG_PATH", os.path.join("notifications", "sms.log"))
+    SMS_RATE_PER_SECOND: float = float(os.getenv("SMS_RATE_PER_SECOND", 50))   # 0 = unlimited
+    SMS_BATCH_SIZE: int = int(os.getenv("SMS_BATCH_SIZE", 500))                # recipients per DB batch
+    SMS_MAX_RETRIES: int = int(os.getenv("SMS_MAX_RETRIES", 3))
+    # Authenticated owner/storeman lookups cached per process (size 0 disables)
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10000))
+    PRINCIPAL_CACHE_TTL_SECONDS: float = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", 60))
+    # Login OTPs: "db" (shared by all workers) or "memory" (single process only)
+    OTP_BACKEND: str = os.getenv("OTP_BACKEND", "db")
+    OTP_LENGTH: int = int(os.getenv("OTP_LENGTH", 6))
+    OTP_TTL_SECONDS: int = int(os.getenv("OTP_TTL_SECONDS", 300))
+    OTP_MAX_ATTEMPTS: int = int(os.getenv("OTP_MAX_ATTEMPTS", 5))                  # wrong guesses per code
+    OTP_MAX_REQUESTS: int = int(os.getenv("OTP_MAX_REQUESTS", 5))                  # codes per mobile per window
+    OTP_REQUEST_WINDOW_SECONDS: int = int(os.getenv("OTP_REQUEST_WINDOW_SECONDS", 900))
+    # Customer typeahead from a per-process in-memory prefix index instead of SQL (off by default)
+    CUSTOMER_SEARCH_INDEX: bool = os.getenv("CUSTOMER_SEARCH_INDEX", "0").lower() in ("1", "true", "yes")
+    CUSTOMER_SEARCH_INDEX_TTL_SECONDS: float = float(os.getenv("CUSTOMER_SEARCH_INDEX_TTL_SECONDS", 300))
+    # Product catalog snapshot; writes in other processes show up within this many seconds
+    CATALOG_TTL_SECONDS: float = float(os.getenv("CATALOG_TTL_SECONDS", 60))
+    # Instrumentation (GET /metrics); SQL_ECHO prints every statement and is for debugging only
+    SQL_ECHO: bool = os.getenv("SQL_ECHO", "0").lower() in ("1", "true", "yes")
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", 200))
+    SLOW_QUERY_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", 1.0))   # share logged with SQL text
     SECRET_KEY: str = os.getenv("SECRET_KEY", "mysecret")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
@@ -1,8 +1,11 @@
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-import random
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session, load_only, raiseload, selectinload, with_expression
 
 from app import models, schemas
+from app.utils import catalog, customer_search, job_queue, resource_versions, sales_rollup
+from app.utils.principal_cache import principal_cache
+from app.utils.pagination import keyset
+from app.utils.phone import normalize_phone
 from sqlalchemy.orm import joinedload
 
 
@@ -22,6 +25,10 @@ def create_owner(db: Session, owner: schemas.OwnerCreate):
     return db_owner
 
 
+def get_owners(db: Session, limit: int = None, after_id: int = None):
+    return keyset(db.query(models.Owner), models.Owner.id, limit, after_id).all()
+
+
 def get_owner_by_mobile(db: Session, mobile: str):
     return db.query(models.Owner).filter(models.Owner.mobile == mobile).first()
 
@@ -39,15 +46,29 @@ def create_store(db: Session, store: schemas.StoreCreate):
         owner_id=store.owner_id
     )
     db.add(db_store)
+    resource_versions.bump(db, resource_versions.STORES, store.owner_id)
     db.commit()
+    principal_cache.invalidate("owner", store.owner_id)
     db.refresh(db_store)
     return db_store
 
 
+def get_store(db: Session, store_id: int, owner_id: int = None):
+    """Fetch a store, optionally only if it belongs to owner_id"""
+    query = db.query(models.Store).filter(models.Store.id == store_id)
+    if owner_id is not None:
+        query = query.filter(models.Store.owner_id == owner_id)
+    return query.first()
+
+
 def get_stores_by_owner(db: Session, owner_id: int):
     return db.query(models.Store).filter(models.Store.owner_id == owner_id).all()
 
 
+def get_store_ids_by_owner(db: Session, owner_id: int):
+    return db.execute(select(models.Store.id).where(models.Store.owner_id == owner_id)).scalars().all()
+
+
 
 
 # ---------------- StoreMan --------------------
@@ -63,56 +84,88 @@ def get_storeman_by_mobile(db: Session, mobile: str):
     return db.query(models.StoreMan).filter(models.StoreMan.mobile == mobile).first()
 
 
-# ---------------- Customer ------------------------
-def create_customer(db: Session, customer: schemas.CustomerCreate):
-    db_customer = models.Customer(**customer.dict())
-    db.add(db_customer)
-    db.commit()
-    db.refresh(db_customer)
-    return db_customer
-
-
-def get_customers_by_store(db: Session, store_id: int):
-    return db.query(models.Customer).filter(models.Customer.store_id == store_id).all()
-
 # ---------------- Products ----------------
 def create_product(db: Session, product: schemas.ProductCreate):
     db_product = models.Product(**product.dict())
     db.add(db_product)
+    resource_versions.bump(db, resource_versions.PRODUCTS, resource_versions.ALL)
     db.commit()
     db.refresh(db_product)
+    catalog.invalidate()
     return db_product
 
 def get_products(db: Session):
     return db.query(models.Product).all()
 
+def update_product(db: Session, product_id: int, product: schemas.ProductCreate):
+    db_product = db.query(models.Product).filter(models.Product.id == product_id).first()
+    if not db_product:
+        return None
+    for key, value in product.dict().items():
+        setattr(db_product, key, value)
+    resource_versions.bump(db, resource_versions.PRODUCTS, resource_versions.ALL)
+    db.commit()
+    db.refresh(db_product)
+    catalog.invalidate()
+    return db_product
+
 
 # ---------------- Orders ----------------
 def create_order(db: Session, order_data: schemas.OrderCreate):
-    db_order = models.Order(
-        store_id=order_data.store_id,
-        customer_id=order_data.customer_id,
-        status="Pending",
+    """
+    Create an order in a fixed number of round trips regardless of how many lines it has:
+    one lookup for store + customer (which must belong to that store), one insert for the
+    header and one executemany for the items. Prices come from the catalog snapshot (utils.catalog), checked against the shared
+    products version first, so a price changed by another process is charged at once; any
+    client-supplied price is ignored.
+    """
+    found = db.execute(
+        select(models.Store.id, models.Customer.id)
+        .select_from(models.Store)
+        .outerjoin(models.Customer, (models.Customer.id == order_data.customer_id)
+                   & (models.Customer.store_id == models.Store.id))
+        .where(models.Store.id == order_data.store_id)
+    ).first()
+    if found is None:
+        raise ValueError("Store not found")
+    if found[1] is None:
+        # another store's customer is reported like a missing one, so ids of other stores don't leak
+        raise ValueError("Customer not found in this store")
+
+    product_ids = {item.product_id for item in order_data.items}
+    prices = catalog.get_prices(db, product_ids)
+    missing = product_ids - prices.keys()
+    if missing:
+        raise ValueError(f"Products not found: {sorted(missing)}")
+
+    total = sum(item.quantity * prices[item.product_id] for item in order_data.items)
+    result = db.execute(
+        insert(models.Order).values(
+            store_id=order_data.store_id,
+            customer_id=order_data.customer_id,
+            total=total,
+            status="Pending",
+        )
     )
-    db.add(db_order)
-    db.flush()  
-
-    total = 0.0
-    for item in order_data.items:
-        subtotal = item.quantity * item.price
-        total += subtotal
-        db_item = models.OrderItem(
-            order_id=db_order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            price=item.price,
+    order_id = result.inserted_primary_key[0]
+
+    if order_data.items:
+        db.execute(
+            insert(models.OrderItem),
+            [
+                {
+                    "order_id": order_id,
+                    "product_id": item.product_id,
+                    "quantity": item.quantity,
+                    "price": prices[item.product_id],
+                }
+                for item in order_data.items
+            ],
         )
-        db.add(db_item)
 
-    db_order.total = total
+    sales_rollup.apply_order(db, order_id)
     db.commit()
-    db.refresh(db_order)
-    return db_order
+    return get_order(db, order_id)
 
 
 def get_order(db: Session, order_id: int):
@@ -125,52 +178,73 @@ def get_order(db: Session, order_id: int):
         .first()
     )
 
-def get_orders_by_customer(db: Session, customer_id: int):
-    return (
+def update_order_status(db: Session, order_id: int, status: str):
+    """Change an order's status, keeping the daily sales rollup in step. None if not found."""
+    db_order = (
         db.query(models.Order)
-        .options(
-            joinedload(models.Order.items).joinedload(models.OrderItem.product)
-        )
-        .filter(models.Order.customer_id == customer_id)
-        .all()
+        .filter(models.Order.id == order_id)
+        .with_for_update()
+        .first()
     )
+    if not db_order:
+        return None
+    old_status = db_order.status
+    db_order.status = status
+    db.flush()
+    sales_rollup.apply_status_change(db, order_id, old_status, status)
+    db.commit()
+    return get_order(db, order_id)
 
-
-def get_orders_by_store(db: Session, store_id: int):
+def get_order_for_invoice(db: Session, order_id: int):
+    """Fetch an order with everything the invoice shows (items, products, store, customer) in one query"""
     return (
         db.query(models.Order)
         .options(
-            joinedload(models.Order.items).joinedload(models.OrderItem.product)
+            joinedload(models.Order.items).joinedload(models.OrderItem.product),
+            joinedload(models.Order.store),
+            joinedload(models.Order.customer),
         )
-        .filter(models.Order.store_id == store_id)
-        .all()
+        .filter(models.Order.id == order_id)
+        .first()
     )
 
+ORDER_VIEWS = ("summary", "detail")
+
+
+def _orders_query(db: Session, view: str):
+    """
+    Order list query for a view:
+    summary - order columns only, plus item_count from a correlated COUNT; no item rows at all
+    detail  - items and their products in two SELECT ... IN batches, instead of one join that
+              repeats every order and product column on every item row
+    """
+    Order, OrderItem = models.Order, models.OrderItem
+    if view == "summary":
+        item_count = (
+            select(func.count(OrderItem.id)).where(OrderItem.order_id == Order.id).scalar_subquery()
+        )
+        return db.query(Order).options(
+            load_only(Order.id, Order.store_id, Order.customer_id, Order.total, Order.status, Order.created_at),
+            with_expression(Order.item_count, item_count),
+            raiseload("*"),
+        )
+    if view == "detail":
+        return db.query(Order).options(selectinload(Order.items).selectinload(OrderItem.product))
+    raise ValueError(f"view must be one of {', '.join(ORDER_VIEWS)}")
+
 
-# ---------------- OTP Helpers ----------------
-def generate_otp(length: int = 6) -> str:
-    """Generate a numeric OTP."""
-    return "".join([str(random.randint(0, 9)) for _ in range(length)])
+def get_orders_by_customer(db: Session, customer_id: int, limit: int = None, after_id: int = None,
+                           view: str = "detail"):
+    query = _orders_query(db, view).filter(models.Order.customer_id == customer_id)
+    return keyset(query, models.Order.id, limit, after_id).all()
 
 
-def set_otp_for_user(user, otp: str, ttl_minutes: int = 5):
-    """Set OTP for either Owner or StoreMan."""
-    user.otp_code = otp
-    user.otp_expires_at = datetime.utcnow() + timedelta(minutes=ttl_minutes)
+def get_orders_by_store(db: Session, store_id: int, limit: int = None, after_id: int = None,
+                        view: str = "detail"):
+    query = _orders_query(db, view).filter(models.Order.store_id == store_id)
+    return keyset(query, models.Order.id, limit, after_id).all()
 
 
-def verify_otp_for_user(user, otp: str) -> bool:
-    """Check if OTP is valid for a user (Owner or StoreMan)."""
-    if not user or not user.otp_code or not user.otp_expires_at:
-        return False
-    if datetime.utcnow() > user.otp_expires_at:
-        return False
-    if user.otp_code != otp:
-        return False
-    # OTP valid → clear it
-    user.otp_code = None
-    user.otp_expires_at = None
-    return True
 # ---------------- Owner Update/Delete ----------------
 def update_owner(db: Session, owner_id: int, owner_update: schemas.OwnerBase):
     db_owner = db.query(models.Owner).filter(models.Owner.id == owner_id).first()
@@ -179,6 +253,7 @@ def update_owner(db: Session, owner_id: int, owner_update: schemas.OwnerBase):
     for key, value in owner_update.dict(exclude_unset=True).items():
         setattr(db_owner, key, value)
     db.commit()
+    principal_cache.invalidate("owner", owner_id)
     db.refresh(db_owner)
     return db_owner
 
@@ -186,8 +261,13 @@ def delete_owner(db: Session, owner_id: int):
     db_owner = db.query(models.Owner).filter(models.Owner.id == owner_id).first()
     if not db_owner:
         return None
+    store_ids = get_store_ids_by_owner(db, owner_id)
     db.delete(db_owner)
+    resource_versions.bump(db, resource_versions.STORES, owner_id)
+    resource_versions.bump(db, resource_versions.STORE, *store_ids)
+    resource_versions.bump(db, resource_versions.OFFERS, resource_versions.ALL, *store_ids)
     db.commit()
+    principal_cache.invalidate("owner", owner_id)
     return db_owner
 
 
@@ -196,9 +276,14 @@ def update_store(db: Session, store_id: int, store_update: schemas.StoreBase):
     db_store = db.query(models.Store).filter(models.Store.id == store_id).first()
     if not db_store:
         return None
+    previous_owner_id = db_store.owner_id
     for key, value in store_update.dict(exclude_unset=True).items():
         setattr(db_store, key, value)
+    resource_versions.bump(db, resource_versions.STORES, *{previous_owner_id, db_store.owner_id})
+    resource_versions.bump(db, resource_versions.STORE, store_id)
     db.commit()
+    principal_cache.invalidate("owner", previous_owner_id)
+    principal_cache.invalidate("owner", db_store.owner_id)
     db.refresh(db_store)
     return db_store
 
@@ -207,7 +292,12 @@ def delete_store(db: Session, store_id: int):
     if not db_store:
         return None
     db.delete(db_store)
+    resource_versions.bump(db, resource_versions.STORES, db_store.owner_id)
+    resource_versions.bump(db, resource_versions.STORE, store_id)
+    # its offers are kept but lose their store_id
+    resource_versions.bump(db, resource_versions.OFFERS, resource_versions.ALL, store_id)
     db.commit()
+    principal_cache.invalidate("owner", db_store.owner_id)
     return db_store
 
 # ---------------- Customer ------------------------
@@ -215,12 +305,51 @@ def create_customer(db: Session, customer: schemas.CustomerCreate):
     db_customer = models.Customer(**customer.dict())
     db.add(db_customer)
     db.commit()
+    customer_search.invalidate(customer.store_id)
     db.refresh(db_customer)
     return db_customer
 
 
-def get_customers_by_store(db: Session, store_id: int):
-    return db.query(models.Customer).filter(models.Customer.store_id == store_id).all()
+def get_customers_by_store(db: Session, store_id: int, limit: int = None, after_id: int = None):
+    query = db.query(models.Customer).filter(models.Customer.store_id == store_id)
+    return keyset(query, models.Customer.id, limit, after_id).all()
+
+
+def search_customers(db: Session, store_id: int, q: str, limit: int = 20):
+    """
+    Typeahead search within a store, every branch an index range scan:
+    a query of digits matches the normalized phone exactly, then as a suffix (via the
+    reversed column); anything else is a case-insensitive name prefix.
+    Ranked exact > suffix > name order. A blank query matches nothing.
+    """
+    Customer = models.Customer
+    q = q.strip()
+    if not q:
+        return []
+    digits = normalize_phone(q)
+    if digits and not any(c.isalpha() for c in q):
+        found = db.query(Customer).filter(
+            Customer.store_id == store_id, Customer.phone_normalized == digits
+        ).order_by(Customer.id).limit(limit).all()
+        if len(found) < limit:
+            suffix = db.query(Customer).filter(
+                Customer.store_id == store_id,
+                *_prefix_range(Customer.phone_reversed, digits[::-1]),
+                Customer.phone_normalized != digits,
+            )
+            found += suffix.order_by(Customer.phone_reversed, Customer.id).limit(limit - len(found)).all()
+        return found
+    return db.query(Customer).filter(
+        Customer.store_id == store_id, *_prefix_range(Customer.name_lower, q.lower())
+    ).order_by(Customer.name_lower, Customer.id).limit(limit).all()
+
+
+def _prefix_range(column, prefix: str):
+    """column starts with prefix, as a range both MySQL and SQLite can seek an index with."""
+    if not prefix:
+        raise ValueError("prefix must not be empty")
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return column >= prefix, column < upper
 
 
 def get_customer(db: Session, customer_id: int):
@@ -231,9 +360,12 @@ def update_customer(db: Session, customer_id: int, updates: dict):
     db_customer = get_customer(db, customer_id)
     if not db_customer:
         return None
+    previous_store_id = db_customer.store_id
     for key, value in updates.items():
         setattr(db_customer, key, value)
     db.commit()
+    customer_search.invalidate(previous_store_id)
+    customer_search.invalidate(db_customer.store_id)
     db.refresh(db_customer)
     return db_customer
 
@@ -242,8 +374,11 @@ def delete_customer(db: Session, customer_id: int):
     db_customer = get_customer(db, customer_id)
     if not db_customer:
         return None
+    # the cascade deletes the customer's orders; take them out of the sales rollups first
+    sales_rollup.apply_orders(db, models.Order.customer_id == customer_id, sales_rollup.counted(), sign=-1)
     db.delete(db_customer)
     db.commit()
+    customer_search.invalidate(db_customer.store_id)
     return db_customer
 
 # ---------------- Inquiry ----------------
@@ -254,8 +389,9 @@ def create_inquiry(db: Session, inquiry: schemas.InquiryCreate):
     db.refresh(db_inquiry)
     return db_inquiry
 
-def get_inquiries_by_store(db: Session, store_id: int):
-    return db.query(models.Inquiry).filter(models.Inquiry.store_id == store_id).all()
+def get_inquiries_by_store(db: Session, store_id: int, limit: int = None, after_id: int = None):
+    query = db.query(models.Inquiry).filter(models.Inquiry.store_id == store_id)
+    return keyset(query, models.Inquiry.id, limit, after_id).all()
 
 def get_inquiries_by_customer(db: Session, customer_id: int):
     return db.query(models.Inquiry).filter(models.Inquiry.customer_id == customer_id).all()
@@ -270,17 +406,35 @@ def update_inquiry_status(db: Session, inquiry_id: int, status: str):
 
 # ---------------- Offer ----------------
 def create_offer(db: Session, offer: schemas.OfferCreate):
+    """Create an offer together with its SMS outbox row and dispatch job, in one transaction."""
     db_offer = models.Offer(**offer.dict())
     db.add(db_offer)
+    db.flush()
+    notification = models.OfferNotification(offer_id=db_offer.id, status="pending")
+    db.add(notification)
+    db.flush()
+    job_queue.enqueue(db, "offer_dispatch", {"notification_id": notification.id}, commit=False)
+    store_ids = [offer.store_id] if offer.store_id is not None else []
+    resource_versions.bump(db, resource_versions.OFFERS, resource_versions.ALL, *store_ids)
     db.commit()
+    job_queue.wakeup()
     db.refresh(db_offer)
     return db_offer
 
-def get_offers_by_store(db: Session, store_id: int):
-    return db.query(models.Offer).filter(models.Offer.store_id == store_id).all()
+def get_offer_notification(db: Session, offer_id: int):
+    return (
+        db.query(models.OfferNotification)
+        .filter(models.OfferNotification.offer_id == offer_id)
+        .order_by(models.OfferNotification.id.desc())
+        .first()
+    )
+
+def get_offers_by_store(db: Session, store_id: int, limit: int = None, after_id: int = None):
+    query = db.query(models.Offer).filter(models.Offer.store_id == store_id)
+    return keyset(query, models.Offer.id, limit, after_id).all()
 
-def get_all_offers(db: Session):
-    return db.query(models.Offer).all()
+def get_all_offers(db: Session, limit: int = None, after_id: int = None):
+    return keyset(db.query(models.Offer), models.Offer.id, limit, after_id).all()
 
 
 # ---------------- Auth Helpers ----------------
@@ -0,0 +1,58 @@
+"""
+Async versions of the crud helpers used by the async routers.
+
+Each coroutine runs the matching function from app.crud through AsyncSession.run_sync,
+so the query logic lives in one place and executes on the asyncio driver without
+borrowing a threadpool worker.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+
+
+# ---------------- Owner ----------------
+async def get_owner_by_id(db: AsyncSession, owner_id: int):
+    return await db.run_sync(crud.get_owner_by_id, owner_id)
+
+async def get_storeman_by_id(db: AsyncSession, storeman_id: int):
+    return await db.run_sync(crud.get_storeman_by_id, storeman_id)
+
+
+# ---------------- Store ----------------
+async def get_store(db: AsyncSession, store_id: int, owner_id: int = None):
+    return await db.run_sync(crud.get_store, store_id, owner_id)
+
+
+# ---------------- Customer ----------------
+async def create_customer(db: AsyncSession, customer: schemas.CustomerCreate):
+    return await db.run_sync(crud.create_customer, customer)
+
+async def get_customer(db: AsyncSession, customer_id: int):
+    return await db.run_sync(crud.get_customer, customer_id)
+
+async def get_customers_by_store(db: AsyncSession, store_id: int, limit: int = None, after_id: int = None):
+    return await db.run_sync(crud.get_customers_by_store, store_id, limit, after_id)
+
+
+# ---------------- Orders ----------------
+async def create_order(db: AsyncSession, order_data: schemas.OrderCreate):
+    return await db.run_sync(crud.create_order, order_data)
+
+async def get_order(db: AsyncSession, order_id: int):
+    return await db.run_sync(crud.get_order, order_id)
+
+async def get_orders_by_customer(db: AsyncSession, customer_id: int, limit: int = None, after_id: int = None,
+                                 view: str = "detail"):
+    return await db.run_sync(crud.get_orders_by_customer, customer_id, limit, after_id, view)
+
+async def get_orders_by_store(db: AsyncSession, store_id: int, limit: int = None, after_id: int = None,
+                              view: str = "detail"):
+    return await db.run_sync(crud.get_orders_by_store, store_id, limit, after_id, view)
+
+
+# ---------------- Offer ----------------
+async def get_offers_by_store(db: AsyncSession, store_id: int, limit: int = None, after_id: int = None):
+    return await db.run_sync(crud.get_offers_by_store, store_id, limit, after_id)
+
+async def get_all_offers(db: AsyncSession, limit: int = None, after_id: int = None):
+    return await db.run_sync(crud.get_all_offers, limit, after_id)
@@ -1,8 +1,12 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.config import settings
+from app.utils.metrics import instrument_engine
+from app.utils.replicas import ReplicaRouter, last_write_from, record_write
 
 # Load .env file
 load_dotenv()
@@ -13,7 +17,20 @@ if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found in .env file")
 
 # Create engine
-engine = create_engine(DATABASE_URL, echo=True)  # echo=True = SQL logs (optional)
+engine = create_engine(DATABASE_URL, echo=settings.SQL_ECHO)  # SQL_ECHO=1 prints every statement (debug only)
+instrument_engine(engine, "primary")
+
+# Read replicas (optional)
+replica_engines = [create_engine(url, pool_pre_ping=True) for url in settings.DATABASE_REPLICA_URLS]
+for index, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica{index}")
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+)
 
 # Session
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -21,10 +38,57 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for models
 Base = declarative_base()
 
-# Dependency for FastAPI routes
+
+@event.listens_for(SessionLocal, "after_flush")
+def _flag_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _flag_dml(orm_execute_state):
+    # Core insert()/update()/delete() run through session.execute bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _stamp_write(session):
+    # the response carries the stamp back to the client (replicas.ReadYourWritesMiddleware)
+    if session.info.pop("wrote", False):
+        record_write()
+
+
+# Dependency for FastAPI routes (primary, read-write)
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Dependency for read-only routes: a healthy replica unless the client's last-write stamp is recent
+def get_read_db(request: Request = None):
+    db = SessionLocal(bind=replica_router.pick(last_write_from(request)))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# ---------------- Async mode ----------------
+# Only built when DB_MODE=async so the asyncio driver (aiomysql/aiosqlite) stays optional.
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, echo=settings.SQL_ECHO)
+    instrument_engine(async_engine.sync_engine, "primary")
+    # expire_on_commit=False: attributes must stay loaded after commit, lazy IO is not allowed
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Async dependency for FastAPI routes
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,12 +1,28 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.database import Base, engine
-from app.routers import owners, customers, orders, stores, auth,inquiries,offers
+from app.config import settings
+from app.database import Base, engine, replica_router
+from app.routers import owners, customers, orders, stores, auth,inquiries,offers,jobs,products
+from app.utils import job_queue
+from app.utils.process_pool import shutdown_process_pool
+from app.utils.principal_cache import principal_cache
+from app.utils import metrics
+from app.utils.replicas import ReadYourWritesMiddleware
 
 # Create tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Store Management System")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background job workers (imports, exports, invoice batches) run in this process
+    job_queue.start_workers(settings.JOB_WORKERS)
+    yield
+    job_queue.stop_workers()
+    shutdown_process_pool()
+
+app = FastAPI(title="Store Management System", lifespan=lifespan)
 
 origins = ["http://localhost:5173", "http://127.0.0.1:5173"]
 
@@ -16,9 +32,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Last-Write"],
 )
+# tells clients when they last wrote, so their reads skip lagging replicas on any worker
+app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.READ_YOUR_WRITES_SECONDS)
+# added last so it is outermost: its timings include CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
 
 # Routers
+if settings.DB_MODE == "async":
+    from app.routers import orders_async, customers_async, offers_async
+
+    # Registered first so they take precedence; anything without an async
+    # counterpart falls through to the sync routers below.
+    app.include_router(orders_async.router)
+    app.include_router(customers_async.router)
+    app.include_router(offers_async.router)
+
 app.include_router(owners.router)
 app.include_router(stores.router)
 app.include_router(customers.router)
@@ -26,6 +56,21 @@ app.include_router(orders.router)
 app.include_router(auth.router)
 app.include_router(inquiries.router)
 app.include_router(offers.router)
+app.include_router(jobs.router)
+app.include_router(products.router)
+
+@app.get("/health/replicas")
+def replica_health():
+    replica_router.check()
+    return replica_router.status()
+
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return principal_cache.stats()
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/")
 def root():
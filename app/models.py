@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey,Float,DateTime,func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey,Float,DateTime,Date,func,Index,JSON
+from sqlalchemy.orm import query_expression, relationship, validates
 from .database import Base
+from .utils.phone import normalize_phone, reverse_phone
 
 from sqlalchemy import Column, Integer, String
 from sqlalchemy.orm import relationship
@@ -14,11 +15,9 @@ class Owner(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(100), unique=True, nullable=True)    # optional
     mobile = Column(String(15), unique=True, nullable=False)   # login with mobile
-    password_hash = Column(String(255), nullable=False)        # password/OTP hash
+    password_hash = Column(String(255), nullable=False)        # password hash
     shop_name = Column(String(200), nullable=False)
     address = Column(String(255), nullable=True)
-    otp_code = Column(String(6), nullable=True)
-    otp_expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relationships
     stores = relationship("Store", back_populates="owner", cascade="all, delete-orphan")
@@ -32,6 +31,10 @@ class Store(Base):
     location = Column(String(255), nullable=True)
     owner_id = Column(Integer, ForeignKey("owners.id"), nullable=False)
 
+    __table_args__ = (
+        Index("ix_stores_owner_id", "owner_id"),
+    )
+
     # Relationships
     owner = relationship("Owner", back_populates="stores")
     customers = relationship("Customer", back_populates="store", cascade="all, delete-orphan")
@@ -62,6 +65,29 @@ class Customer(Base):
     phone = Column(String(15), nullable=True)
     address=Column(String(255), nullable=True)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=False)
+    name_lower = Column(String(100), nullable=True)        # search columns, kept in sync below
+    phone_normalized = Column(String(15), nullable=True)   # digits only
+    phone_reversed = Column(String(15), nullable=True)     # for "ends with" searches
+
+    __table_args__ = (
+        Index("ix_customers_store_id_id", "store_id", "id"),     # keyset pages per store
+        Index("ix_customers_store_id_phone", "store_id", "phone"),
+        Index("ix_customers_phone", "phone"),
+        Index("ix_customers_store_id_name_lower", "store_id", "name_lower"),        # typeahead by name
+        Index("ix_customers_store_id_phone_normalized", "store_id", "phone_normalized"),
+        Index("ix_customers_store_id_phone_reversed", "store_id", "phone_reversed"),
+    )
+
+    @validates("name")
+    def _sync_name_search_column(self, key, name):
+        self.name_lower = name.lower() if name is not None else None
+        return name
+
+    @validates("phone")
+    def _sync_phone_search_columns(self, key, phone):
+        self.phone_normalized = normalize_phone(phone)
+        self.phone_reversed = reverse_phone(phone)
+        return phone
     
     # Relationships
     store = relationship("Store", back_populates="customers")
@@ -79,11 +105,20 @@ class Order(Base):
     status = Column(String(100), default="Pending")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_orders_store_id_id", "store_id", "id"),                  # keyset pages per store
+        Index("ix_orders_store_id_created_at_id", "store_id", "created_at", "id"),  # date ranges
+        Index("ix_orders_customer_id_id", "customer_id", "id"),
+    )
+
     # Relationships
     store = relationship("Store", back_populates="orders")
     customer = relationship("Customer", back_populates="orders")
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # filled in by the summary order list query (crud._orders_query), None otherwise
+    item_count = query_expression()
+
 
 class OrderItem(Base):
     __tablename__ = "order_items"
@@ -94,6 +129,11 @@ class OrderItem(Base):
     quantity = Column(Integer, nullable=False)
     price = Column(Float, nullable=False)
 
+    __table_args__ = (
+        Index("ix_order_items_order_id", "order_id"),
+        Index("ix_order_items_product_id", "product_id"),
+    )
+
     # Relationships
     order = relationship("Order", back_populates="items")
     product = relationship("Product", back_populates="order_items")
@@ -119,6 +159,11 @@ class Inquiry(Base):
     status = Column(String(50), default="Pending")   # Pending, Resolved, Closed
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_inquiries_store_id_id", "store_id", "id"),
+        Index("ix_inquiries_customer_id_id", "customer_id", "id"),
+    )
+
     # Relationships
     customer = relationship("Customer", back_populates="inquiries")
     store = relationship("Store", back_populates="inquiries")
@@ -132,7 +177,129 @@ class Offer(Base):
     discount = Column(Integer, nullable=False)   
     valid_until = Column(DateTime(timezone=True), nullable=False)
     store_id = Column(Integer, ForeignKey("stores.id"), nullable=True)
+    segment = Column(String(20), nullable=True)   # only customers in this RFM segment
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_offers_store_id_id", "store_id", "id"),
+        Index("ix_offers_store_id_valid_until", "store_id", "valid_until"),
+    )
     
 
     store = relationship("Store", back_populates="offers")
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)                   # customer_import, customer_export, invoices
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, done, failed
+    params = Column(JSON, nullable=True)
+    owner_id = Column(Integer, ForeignKey("owners.id"), nullable=True)
+    progress = Column(Integer, nullable=False, default=0)        # units done (rows, invoices, ...)
+    total = Column(Integer, nullable=True)                       # units expected, if known
+    result = Column(JSON, nullable=True)
+    result_path = Column(String(255), nullable=True)             # downloadable output file
+    error = Column(String(1000), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)   # lease; refreshed on progress
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),   # queue scan: oldest queued job first
+        Index("ix_jobs_owner_id_id", "owner_id", "id"),
+    )
+
+
+class OfferNotification(Base):
+    """Outbox row for an offer's SMS campaign, written in the same transaction as the offer."""
+    __tablename__ = "offer_notifications"
+
+    id = Column(Integer, primary_key=True, index=True)
+    offer_id = Column(Integer, ForeignKey("offers.id"), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")   # pending, sending, done, failed
+    total = Column(Integer, nullable=True)                  # recipients, counted when sending starts
+    sent = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    last_customer_id = Column(Integer, nullable=False, default=0)     # resume point after a crash
+    messages_per_second = Column(Float, nullable=True)
+    error = Column(String(1000), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_offer_notifications_offer_id", "offer_id"),
+    )
+
+
+class OTPCode(Base):
+    """Current login OTP and request counter for one role:mobile (see app/utils/otp_service.py)."""
+    __tablename__ = "otp_codes"
+
+    key = Column(String(64), primary_key=True)                  # "owner:9876543210"
+    code_hash = Column(String(64), nullable=True)               # HMAC of the code; NULL once used
+    expires_at = Column(DateTime(timezone=True), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    window_started_at = Column(DateTime(timezone=True), nullable=False)
+    requests = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ix_otp_codes_expires_at", "expires_at"),
+    )
+
+
+class StoreDailySales(Base):
+    """Per store, per day sales rollup maintained by app/utils/sales_rollup.py."""
+    __tablename__ = "store_daily_sales"
+
+    store_id = Column(Integer, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    orders = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    items = Column(Integer, nullable=False, default=0)
+
+
+class StoreProductDailySales(Base):
+    """Per store, per product, per day sales counters (top-products leaderboard)."""
+    __tablename__ = "store_product_daily_sales"
+
+    store_id = Column(Integer, ForeignKey("stores.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0.0)
+
+
+class CustomerSegment(Base):
+    """Latest RFM scores and segment of a customer (app/utils/segmentation.py)."""
+    __tablename__ = "customer_segments"
+
+    customer_id = Column(Integer, ForeignKey("customers.id", ondelete="CASCADE"), primary_key=True)
+    store_id = Column(Integer, ForeignKey("stores.id", ondelete="CASCADE"), nullable=False)
+    recency_days = Column(Integer, nullable=False)
+    frequency = Column(Integer, nullable=False)
+    monetary = Column(Float, nullable=False)
+    r_score = Column(Integer, nullable=False)
+    f_score = Column(Integer, nullable=False)
+    m_score = Column(Integer, nullable=False)
+    segment = Column(String(20), nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_customer_segments_store_id_segment", "store_id", "segment", "customer_id"),
+        Index("ix_customer_segments_segment_customer_id", "segment", "customer_id"),
+    )
+
+
+class ResourceVersion(Base):
+    """Change counter of a cached resource, bumped by the crud writes (app/utils/resource_versions.py)."""
+    __tablename__ = "resource_versions"
+
+    scope = Column(String(30), primary_key=True)
+    resource_id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
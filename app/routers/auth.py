@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from .. import schemas, crud, database, models
-from datetime import datetime, timedelta
+from .. import schemas, crud, database
 from app.auth import create_access_token  # Import the token creator
+from app.utils import otp_service
+from app.utils.sms import Message, get_provider
 
 # Create an APIRouter instance for authentication routes
 router = APIRouter(
@@ -27,13 +28,14 @@ def request_otp(otp_request: schemas.OTPRequest, db: Session = Depends(database.
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
 
-    # Generate and set the OTP for the user
-    otp_code = crud.generate_otp()
-    crud.set_otp_for_user(user, otp_code)
-    db.commit() # Commit the changes to the database
+    # Generate and store the OTP (shared across workers, rate limited per mobile)
+    try:
+        otp_code = otp_service.generate_otp(otp_request.role, user.mobile)
+    except otp_service.OTPRateLimited as e:
+        raise HTTPException(status_code=429, detail=str(e))
 
-    # In a real application, you would send this OTP via SMS or email
-    print(f"OTP for {user.name} ({user.mobile}): {otp_code}") # For demonstration
+    # Deliver it through the configured SMS provider
+    get_provider().send_batch([Message(user.mobile, f"Your login OTP is {otp_code}", None, secret=otp_code)])
 
     return {"message": "OTP sent successfully."}
 
@@ -53,12 +55,9 @@ def verify_otp(otp_verify: schemas.OTPVerify, db: Session = Depends(database.get
         raise HTTPException(status_code=404, detail="User not found.")
 
     # Verify the provided OTP
-    if not crud.verify_otp_for_user(user, otp_verify.otp):
-        db.rollback()
+    if not otp_service.verify_otp(otp_verify.role, user.mobile, otp_verify.otp):
         raise HTTPException(status_code=400, detail="Invalid or expired OTP.")
 
-    db.commit()
-
     # Generate JWT token
     token_data = {"sub": str(user.id), "role": otp_verify.role}
     access_token = create_access_token(token_data)
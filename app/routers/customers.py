@@ -1,62 +1,55 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from sqlalchemy.orm import Session
-import pandas as pd
+import os
+from typing import List
 from app import models, schemas, crud, database, auth
-from fastapi.responses import FileResponse
-from app.utils.export_service import export_customers_to_excel
+from app.config import settings
+from app.utils import customer_search
+from app.utils.customer_import import REJECT_DIR, import_customers
+from fastapi.responses import FileResponse, StreamingResponse
+from app.utils.export_service import CUSTOMER_HEADERS, iter_customer_rows
+from app.utils.streaming import XLSX_MEDIA_TYPE, stream_csv, stream_xlsx
+from app.utils.pagination import PageParams, build_page, page_params
 
 router = APIRouter(prefix="/customers", tags=["Customers"])
 
 
-# 🔹 Bulk Upload Customers
+# 🔹 Bulk Upload Customers (streamed in chunks, one commit per chunk)
 @router.post("/upload-bulk/")
-async def upload_customers(
+def upload_customers(
     store_id: int,   # ✅ which store these customers belong to
     file: UploadFile = File(...),
     db: Session = Depends(database.get_db),
-    current_owner = Depends(auth.get_current_owner)
+    current_owner = Depends(auth.get_store_owner)   # validates store belongs to current owner
 ):
     # Validate file type
     if not (file.filename.endswith(".csv") or file.filename.endswith(".xlsx")):
         raise HTTPException(status_code=400, detail="Only CSV or Excel files are supported")
 
-    # Validate store belongs to current owner
-    store = db.query(models.Store).filter(
-        models.Store.id == store_id,
-        models.Store.owner_id == current_owner.id
-    ).first()
-    if not store:
-        raise HTTPException(status_code=403, detail="Store not found or not owned by you")
-
-    # Read file into DataFrame
     try:
-        if file.filename.endswith(".csv"):
-            df = pd.read_csv(file.file)
-        else:  # Excel
-            df = pd.read_excel(file.file)
+        summary = import_customers(db, store_id, file.file, file.filename, settings.IMPORT_CHUNK_SIZE)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
 
-    # Validate required columns
-    required_columns = {"name", "email", "phone"}
-    if not required_columns.issubset(set(df.columns)):
-        raise HTTPException(status_code=400, detail=f"File must contain columns: {required_columns}")
+    if summary["reject_file"]:
+        summary["reject_file_url"] = f"/customers/upload-bulk/rejects/{store_id}/{summary['reject_file']}"
+    summary["message"] = f"Successfully inserted {summary['inserted']} customers into store {store_id}"
+    return summary
 
-    # Insert rows into DB
-    customers = []
-    for _, row in df.iterrows():
-        customer = models.Customer(
-            name=row["name"],
-            email=row.get("email"),
-            phone=row.get("phone"),
-            store_id=store_id   # ✅ assign to store
-        )
-        customers.append(customer)
 
-    db.bulk_save_objects(customers)
-    db.commit()
-
-    return {"message": f"Successfully inserted {len(customers)} customers into store {store_id}"}
+# 🔹 Download the reject file of a bulk upload
+@router.get("/upload-bulk/rejects/{store_id}/{file_name}")
+def download_rejects(
+    store_id: int,
+    file_name: str,
+    current_owner = Depends(auth.get_store_owner)
+):
+    file_path = os.path.join(REJECT_DIR, os.path.basename(file_name))
+    if not file_name.startswith(f"rejects_store{store_id}_") or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Reject file not found")
+    return FileResponse(path=file_path, filename=file_name, media_type="text/csv")
 
 
 # 🔹 Create Single Customer
@@ -67,32 +60,36 @@ def create_customer(
     current_owner = Depends(auth.get_current_owner)
 ):
     # Validate store belongs to current owner
-    store = db.query(models.Store).filter(
-        models.Store.id == customer.store_id,
-        models.Store.owner_id == current_owner.id
-    ).first()
-    if not store:
-        raise HTTPException(status_code=403, detail="Store not found or not owned by you")
+    auth.ensure_store_access(db, current_owner, customer.store_id)
 
     return crud.create_customer(db, customer)
 
 
 # 🔹 Get Customers for a Store
-@router.get("/by-store/{store_id}", response_model=list[schemas.CustomerOut])
+@router.get("/by-store/{store_id}", response_model=schemas.Page[schemas.CustomerOut])
 def get_customers_by_store(
     store_id: int,
-    db: Session = Depends(database.get_db),
-    current_owner = Depends(auth.get_current_owner)
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(database.get_read_db),
+    current_owner = Depends(auth.get_store_owner)   # validates store belongs to current owner
 ):
-    # Validate store belongs to current owner
-    store = db.query(models.Store).filter(
-        models.Store.id == store_id,
-        models.Store.owner_id == current_owner.id
-    ).first()
-    if not store:
-        raise HTTPException(status_code=403, detail="Store not found or not owned by you")
+    customers = crud.get_customers_by_store(db, store_id, page.limit, page.after_id)
+    return build_page(customers, page.limit)
 
-    return crud.get_customers_by_store(db, store_id)
+# 🔹 Typeahead search within a store (name prefix, or exact / trailing digits of the phone)
+@router.get("/search", response_model=List[schemas.CustomerOut])
+def search_customers(
+    store_id: int,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(database.get_read_db),
+    current_owner = Depends(auth.get_store_owner)   # validates store belongs to current owner
+):
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Search query must not be blank")
+    if customer_search.enabled():
+        return customer_search.search(db, store_id, q, limit)
+    return crud.search_customers(db, store_id, q, limit)
 
 # 🔹 Update Customer
 @router.put("/{customer_id}", response_model=schemas.CustomerOut)
@@ -107,8 +104,7 @@ def update_customer(
         raise HTTPException(status_code=404, detail="Customer not found")
 
     # ensure store belongs to owner
-    if db_customer.store.owner_id != current_owner.id:
-        raise HTTPException(status_code=403, detail="Not authorized to update this customer")
+    auth.ensure_store_access(db, current_owner, db_customer.store_id, "Not authorized to update this customer")
 
     updated = crud.update_customer(db, customer_id, customer_update.dict(exclude_unset=True))
     return updated
@@ -126,36 +122,39 @@ def delete_customer(
         raise HTTPException(status_code=404, detail="Customer not found")
 
     # ensure store belongs to owner
-    if db_customer.store.owner_id != current_owner.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this customer")
+    auth.ensure_store_access(db, current_owner, db_customer.store_id, "Not authorized to delete this customer")
 
     crud.delete_customer(db, customer_id)
     return {"message": f"Customer {customer_id} deleted successfully"}
 
-# 🔹 Export Customers (by store)
+# 🔹 Export Customers (by store), streamed in keyset-paged batches
 @router.get("/export/{store_id}")
 def export_customers(
     store_id: int,
-    db: Session = Depends(database.get_db),
-    current_owner = Depends(auth.get_current_owner)
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$"),
+    db: Session = Depends(database.get_read_db),
+    current_owner = Depends(auth.get_store_owner)   # validates store belongs to current owner
 ):
-    # validate store belongs to current owner
-    store = db.query(models.Store).filter(
-        models.Store.id == store_id,
-        models.Store.owner_id == current_owner.id
-    ).first()
-    if not store:
-        raise HTTPException(status_code=403, detail="Store not found or not owned by you")
-
-    customers = crud.get_customers_by_store(db, store_id)
-    if not customers:
+    if not db.query(models.Customer.id).filter(models.Customer.store_id == store_id).first():
         raise HTTPException(status_code=404, detail="No customers found for this store")
 
-    file_path = export_customers_to_excel(customers, f"customers_store_{store_id}.xlsx")
-
-    return FileResponse(
-        path=file_path,
-        filename=f"customers_store_{store_id}.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    bind = db.get_bind()
+
+    def rows():
+        # own session: the request's session is closed before the body finishes streaming
+        stream_db = database.SessionLocal(bind=bind)
+        try:
+            yield from iter_customer_rows(stream_db, store_id)
+        finally:
+            stream_db.close()
+
+    file_name = f"customers_store_{store_id}.{format}"
+    if format == "csv":
+        body, media_type = stream_csv(CUSTOMER_HEADERS, rows()), "text/csv"
+    else:
+        body, media_type = stream_xlsx(CUSTOMER_HEADERS, rows(), sheet="Customers"), XLSX_MEDIA_TYPE
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
     )
-
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud_async, database, auth
+from app.utils.pagination import PageParams, build_page, page_params
+
+# Async counterparts of the JSON endpoints in customers.py (DB_MODE=async).
+# Upload, update, delete and export stay on the sync router.
+router = APIRouter(prefix="/customers", tags=["Customers"])
+
+
+# 🔹 Create Single Customer
+@router.post("/", response_model=schemas.CustomerOut)
+async def create_customer(
+    customer: schemas.CustomerCreate,
+    db: AsyncSession = Depends(database.get_async_db),
+    current_owner = Depends(auth.get_current_owner_async)
+):
+    # Validate store belongs to current owner
+    await auth.ensure_store_access_async(db, current_owner, customer.store_id)
+
+    return await crud_async.create_customer(db, customer)
+
+
+# 🔹 Get Customers for a Store
+@router.get("/by-store/{store_id}", response_model=schemas.Page[schemas.CustomerOut])
+async def get_customers_by_store(
+    store_id: int,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(database.get_async_db),
+    current_owner = Depends(auth.get_store_owner_async)   # validates store belongs to current owner
+):
+    customers = await crud_async.get_customers_by_store(db, store_id, page.limit, page.after_id)
+    return build_page(customers, page.limit)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import models, schemas, crud, database, auth
+from app.utils.pagination import PageParams, build_page, page_params
 
 router = APIRouter(prefix="/inquiries", tags=["Inquiries"])
 
@@ -19,18 +20,15 @@ def create_inquiry(
 
 
 # 🔹 Owner views all inquiries for their store
-@router.get("/by-store/{store_id}", response_model=list[schemas.InquiryOut])
+@router.get("/by-store/{store_id}", response_model=schemas.Page[schemas.InquiryOut])
 def get_inquiries_by_store(
     store_id: int,
-    db: Session = Depends(database.get_db),
-    current_owner = Depends(auth.get_current_owner)
+    page: PageParams = Depends(page_params),
+    db: Session = Depends(database.get_read_db),
+    current_owner = Depends(auth.get_store_owner)   # checks ownership
 ):
-    # check ownership
-    store = db.query(models.Store).filter(models.Store.id == store_id, models.Store.owner_id == current_owner.id).first()
-    if not store:
-        raise HTTPException(status_code=403, detail="Not authorized")
-
-    return crud.get_inquiries_by_store(db, store_id)
+    inquiries = crud.get_inquiries_by_store(db, store_id, page.limit, page.after_id)
+    return build_page(inquiries, page.limit)
 
 
 
@@ -49,8 +47,7 @@ def update_inquiry_status(
         raise HTTPException(status_code=404, detail="Inquiry not found")
 
     # Check ownership
-    if inquiry.store.owner_id != current_owner.id:
-        raise HTTPException(status_code=403, detail="Not authorized")
+    auth.ensure_store_access(db, current_owner, inquiry.store_id, "Not authorized")
 
     updated = crud.update_inquiry_status(db, inquiry_id, status)
     return {"message": f"Inquiry {inquiry_id} status updated to {status}"}
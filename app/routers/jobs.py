@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+import os, shutil, uuid
+from app import models, schemas, database, auth
+from app.utils import job_handlers  # noqa: F401  (registers the job kinds)
+from app.utils.job_queue import enqueue, get_job
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+JOB_UPLOAD_DIR = os.path.join("uploads", "jobs")
+os.makedirs(JOB_UPLOAD_DIR, exist_ok=True)
+
+
+def _job_out(job: models.Job) -> schemas.JobOut:
+    out = schemas.JobOut.model_validate(job)
+    if job.status == "done" and job.result_path:
+        out.download_url = f"/jobs/{job.id}/download"
+    return out
+
+
+# 🔹 Queue a customer import
+@router.post("/customer-import", response_model=schemas.JobOut, status_code=202)
+def queue_customer_import(
+    store_id: int,
+    file: UploadFile = File(...),
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_store_owner)
+):
+    if not (file.filename.endswith(".csv") or file.filename.endswith(".xlsx")):
+        raise HTTPException(status_code=400, detail="Only CSV or Excel files are supported")
+
+    file_path = os.path.join(JOB_UPLOAD_DIR, f"{uuid.uuid4().hex}_{os.path.basename(file.filename)}")
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+    job = enqueue(db, "customer_import",
+                  {"store_id": store_id, "file_path": file_path, "filename": file.filename},
+                  owner_id=current_owner.id)
+    return _job_out(job)
+
+
+# 🔹 Queue a customer export
+@router.post("/customer-export/{store_id}", response_model=schemas.JobOut, status_code=202)
+def queue_customer_export(
+    store_id: int,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_store_owner)
+):
+    job = enqueue(db, "customer_export", {"store_id": store_id}, owner_id=current_owner.id)
+    return _job_out(job)
+
+
+# 🔹 Queue RFM segmentation of a store's customers (used to target offers)
+@router.post("/customer-segments/{store_id}", response_model=schemas.JobOut, status_code=202)
+def queue_customer_segments(
+    store_id: int,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_store_owner)
+):
+    job = enqueue(db, "customer_segments", {"store_id": store_id}, owner_id=current_owner.id)
+    return _job_out(job)
+
+
+# 🔹 Queue invoice generation for a batch of orders
+@router.post("/invoices", response_model=schemas.JobOut, status_code=202)
+def queue_invoices(
+    request: schemas.InvoiceJobCreate,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    order_ids = sorted(set(request.order_ids))
+    owned = db.query(models.Order.id).join(models.Store).filter(
+        models.Order.id.in_(order_ids),
+        models.Store.owner_id == current_owner.id
+    ).count()
+    if owned != len(order_ids):
+        raise HTTPException(status_code=403, detail="Orders not found or not owned by you")
+
+    job = enqueue(db, "invoices", {"order_ids": order_ids}, owner_id=current_owner.id)
+    return _job_out(job)
+
+
+# 🔹 Job status and progress
+@router.get("/{job_id}", response_model=schemas.JobOut)
+def get_job_status(
+    job_id: int,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    job = get_job(db, job_id)
+    if not job or job.owner_id != current_owner.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_out(job)
+
+
+# 🔹 Download the job's result file
+@router.get("/{job_id}/download")
+def download_job_result(
+    job_id: int,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    job = get_job(db, job_id)
+    if not job or job.owner_id != current_owner.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != "done" or not job.result_path or not os.path.isfile(job.result_path):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}, no result file available")
+    return FileResponse(path=job.result_path, filename=os.path.basename(job.result_path))
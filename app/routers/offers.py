@@ -1,37 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import models, schemas, crud, database
+from app import schemas, crud, database
+from app.utils import job_handlers  # noqa: F401  (registers the offer_dispatch job)
+from app.utils import resource_versions
+from app.utils.http_cache import conditional_get
+from app.utils.pagination import PageParams, build_page, page_params
 
 router = APIRouter(prefix="/offers", tags=["Offers"])
 
 get_db = database.get_db
+get_read_db = database.get_read_db
+
+# tablets poll these; shared caches may store them but must revalidate (cheap 304s)
+OFFERS_CACHE_CONTROL = "public, no-cache"
 
 # ---------------- Owner creates offer ----------------
 @router.post("/", response_model=schemas.OfferOut)
 def create_offer(offer: schemas.OfferCreate, db: Session = Depends(get_db)):
-    db_offer = crud.create_offer(db, offer)
-
-    # 🔹 Find customers to send SMS
-    if offer.store_id:
-        customers = db.query(models.Customer).filter(models.Customer.store_id == offer.store_id).all()
-    else:
-        customers = db.query(models.Customer).all()
+    # 🔹 SMS fan-out runs as a background job (see app/utils/offer_dispatch.py)
+    return crud.create_offer(db, offer)
 
-    # 🔹 Demo SMS sending
-    for customer in customers:
-        if customer.phone:
-            print(f"📩 SMS to {customer.phone}: {offer.title} - {offer.description} (Valid till {offer.valid_until})")
 
-    return db_offer
+# ---------------- SMS delivery status of an offer ----------------
+@router.get("/{offer_id}/delivery", response_model=schemas.OfferDeliveryOut)
+def get_offer_delivery(offer_id: int, db: Session = Depends(get_db)):
+    notification = crud.get_offer_notification(db, offer_id)
+    if not notification:
+        raise HTTPException(status_code=404, detail="Offer not found")
+    return notification
 
 
 # ---------------- Get offers by store ----------------
-@router.get("/by-store/{store_id}", response_model=list[schemas.OfferOut])
-def get_offers_by_store(store_id: int, db: Session = Depends(get_db)):
-    return crud.get_offers_by_store(db, store_id)
+@router.get(
+    "/by-store/{store_id}",
+    response_model=schemas.Page[schemas.OfferOut],
+    dependencies=[Depends(conditional_get(resource_versions.OFFERS, "store_id", OFFERS_CACHE_CONTROL))],
+)
+def get_offers_by_store(store_id: int, page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)):
+    offers = crud.get_offers_by_store(db, store_id, page.limit, page.after_id)
+    return build_page(offers, page.limit)
 
 
 # ---------------- Get all offers ----------------
-@router.get("/", response_model=list[schemas.OfferOut])
-def get_all_offers(db: Session = Depends(get_db)):
-    return crud.get_all_offers(db)
+@router.get(
+    "/",
+    response_model=schemas.Page[schemas.OfferOut],
+    dependencies=[Depends(conditional_get(resource_versions.OFFERS, cache_control=OFFERS_CACHE_CONTROL))],
+)
+def get_all_offers(page: PageParams = Depends(page_params), db: Session = Depends(get_read_db)):
+    offers = crud.get_all_offers(db, page.limit, page.after_id)
+    return build_page(offers, page.limit)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud_async, database
+from app.utils import resource_versions
+from app.utils.http_cache import conditional_get_async
+from app.utils.pagination import PageParams, build_page, page_params
+from app.routers.offers import OFFERS_CACHE_CONTROL
+
+# Async counterparts of the read endpoints in offers.py (DB_MODE=async).
+router = APIRouter(prefix="/offers", tags=["Offers"])
+
+get_db = database.get_async_db
+
+
+# ---------------- Get offers by store ----------------
+@router.get(
+    "/by-store/{store_id}",
+    response_model=schemas.Page[schemas.OfferOut],
+    dependencies=[Depends(conditional_get_async(resource_versions.OFFERS, "store_id", OFFERS_CACHE_CONTROL))],
+)
+async def get_offers_by_store(store_id: int, page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db)):
+    offers = await crud_async.get_offers_by_store(db, store_id, page.limit, page.after_id)
+    return build_page(offers, page.limit)
+
+
+# ---------------- Get all offers ----------------
+@router.get(
+    "/",
+    response_model=schemas.Page[schemas.OfferOut],
+    dependencies=[Depends(conditional_get_async(resource_versions.OFFERS, cache_control=OFFERS_CACHE_CONTROL))],
+)
+async def get_all_offers(page: PageParams = Depends(page_params), db: AsyncSession = Depends(get_db)):
+    offers = await crud_async.get_all_offers(db, page.limit, page.after_id)
+    return build_page(offers, page.limit)
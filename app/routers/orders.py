@@ -1,75 +1,163 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from typing import Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app import schemas, crud, database, models
-from app.utils import invoice_service
+from app import schemas, crud, database, models, auth
+from app.utils import invoice_batch, invoice_cache, invoice_service, order_rows
+from app.utils.process_pool import get_process_pool
+from app.config import settings
+from app.utils.http_cache import etag_matches, not_modified
+from app.utils.pagination import PageParams, build_page, page_params
 
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
+# clients may keep the PDF but must revalidate; unchanged invoices come back as 304
+INVOICE_CACHE_CONTROL = "private, no-cache"
+
 
 # ---------------- Create Order ----------------
 @router.post("/", response_model=schemas.OrderOut)
 def create_order(order: schemas.OrderCreate, db: Session = Depends(database.get_db)):
-    store = db.query(models.Store).filter(models.Store.id == order.store_id).first()
-    if not store:
-        raise HTTPException(status_code=404, detail="Store not found")
-
-    customer = db.query(models.Customer).filter(models.Customer.id == order.customer_id).first()
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-
-    return crud.create_order(db, order)
+    try:
+        return crud.create_order(db, order)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 
 # ---------------- Get Order by ID ----------------
 @router.get("/{order_id}", response_model=schemas.OrderOut)
-def get_order(order_id: int, db: Session = Depends(database.get_db)):
+def get_order(order_id: int, db: Session = Depends(database.get_read_db)):
     db_order = crud.get_order(db, order_id)
     if not db_order:
         raise HTTPException(status_code=404, detail="Order not found")
     return db_order
 
 
+# ?view=summary lists orders without their items (item_count instead), ?view=detail in full
+ORDER_PAGE = Union[schemas.Page[schemas.OrderOut], schemas.Page[schemas.OrderSummary]]
+ORDER_VIEW = Query("detail", pattern="^(summary|detail)$")
+
+
+def summary_page(orders, limit: int):
+    # validated here: the summary rows have no items for OrderOut to look at
+    return schemas.Page[schemas.OrderSummary].model_validate(build_page(orders, limit))
+
+
 # ---------------- Get Orders by Customer ----------------
-@router.get("/by-customer/{customer_id}", response_model=list[schemas.OrderOut])
-def get_orders_by_customer(customer_id: int, db: Session = Depends(database.get_db)):
-    orders = crud.get_orders_by_customer(db, customer_id)
-    if not orders:
+@router.get("/by-customer/{customer_id}", response_model=ORDER_PAGE)
+def get_orders_by_customer(
+    customer_id: int,
+    page: PageParams = Depends(page_params),
+    view: str = ORDER_VIEW,
+    db: Session = Depends(database.get_read_db)
+):
+    orders = crud.get_orders_by_customer(db, customer_id, page.limit, page.after_id, view)
+    if not orders and page.after_id is None:
         raise HTTPException(status_code=404, detail="No orders found for this customer")
-    return orders
+    if view == "summary":
+        return summary_page(orders, page.limit)
+    return build_page(orders, page.limit)
 
 
 # ---------------- Get Orders by Store ----------------
-@router.get("/by-store/{store_id}", response_model=list[schemas.OrderOut])
-def get_orders_by_store(store_id: int, db: Session = Depends(database.get_db)):
-    orders = crud.get_orders_by_store(db, store_id)
-    if not orders:
+@router.get("/by-store/{store_id}", response_model=ORDER_PAGE)
+def get_orders_by_store(
+    store_id: int,
+    page: PageParams = Depends(page_params),
+    view: str = ORDER_VIEW,
+    db: Session = Depends(database.get_read_db)
+):
+    if view == "summary":
+        orders = crud.get_orders_by_store(db, store_id, page.limit, page.after_id, view)
+        if not orders and page.after_id is None:
+            raise HTTPException(status_code=404, detail="No orders found for this store")
+        return summary_page(orders, page.limit)
+    # Core rows + cached TypeAdapter + orjson instead of ORM instances (utils/order_rows.py)
+    result = order_rows.store_orders_page(db, store_id, page.limit, page.after_id)
+    if result is None:
         raise HTTPException(status_code=404, detail="No orders found for this store")
-    return orders
+    return order_rows.OrderJSONResponse(result)
+
+
+# ---------------- Update Order Status ----------------
+@router.patch("/{order_id}/status", response_model=schemas.OrderOut)
+def update_order_status(
+    order_id: int,
+    update: schemas.OrderStatusUpdate,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    store_id = db.query(models.Order.store_id).filter(models.Order.id == order_id).scalar()
+    if store_id is None:
+        raise HTTPException(status_code=404, detail="Order not found")
+    auth.ensure_store_access(db, current_owner, store_id, "Not authorized")
+
+    db_order = crud.update_order_status(db, order_id, update.status)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    invoice_cache.invalidate(order_id)   # the invoice shows the status
+    return db_order
 
 
 # ---------------- Generate Invoice (JSON response) ----------------
 @router.post("/{order_id}/invoice", response_model=schemas.InvoiceResponse)
-def generate_invoice(order_id: int, db: Session = Depends(database.get_db)):
-    order = crud.get_order(db, order_id)
+def generate_invoice(order_id: int, db: Session = Depends(database.get_read_db)):
+    order = crud.get_order_for_invoice(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    file_path = invoice_service.create_invoice(order)
+    file_path = invoice_cache.get_or_render(invoice_service.snapshot_order(order))
     return {"message": "Invoice generated", "file_path": file_path}
 
 
 # ---------------- Download Invoice (PDF file response) ----------------
 @router.get("/{order_id}/invoice/download")
-def download_invoice(order_id: int, db: Session = Depends(database.get_db)):
-    order = crud.get_order(db, order_id)
+def download_invoice(order_id: int, request: Request, db: Session = Depends(database.get_read_db)):
+    order = crud.get_order_for_invoice(db, order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
-    file_path = invoice_service.create_invoice(order)
+    snapshot = invoice_service.snapshot_order(order)
+    etag = invoice_cache.etag_for(snapshot)
+    if etag_matches(request, etag):
+        return not_modified(etag, INVOICE_CACHE_CONTROL)
+
+    file_path = invoice_cache.get_or_render(snapshot)
     return FileResponse(
         path=file_path,
         media_type="application/pdf",
-        filename=f"invoice_{order_id}.pdf"
+        filename=f"invoice_{order_id}.pdf",
+        headers={"ETag": etag, "Cache-Control": INVOICE_CACHE_CONTROL}
+    )
+
+
+# ---------------- Batch Invoices (streamed ZIP) ----------------
+@router.post("/invoices/batch")
+def batch_invoices(
+    batch: schemas.InvoiceBatchRequest,
+    db: Session = Depends(database.get_read_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    if batch.date_to < batch.date_from:
+        raise HTTPException(status_code=400, detail="date_to must not be before date_from")
+    auth.ensure_store_access(db, current_owner, batch.store_id)
+
+    bind = db.get_bind()
+
+    def body():
+        # own session: the request's session is closed before the body finishes streaming
+        stream_db = database.SessionLocal(bind=bind)
+        try:
+            snapshots = invoice_batch.iter_order_snapshots(stream_db, batch.store_id, batch.date_from, batch.date_to)
+            rendered = invoice_batch.render_parallel(snapshots, get_process_pool(), 2 * max(1, settings.JOB_PROCESSES))
+            yield from invoice_batch.stream_zip(rendered)
+        finally:
+            stream_db.close()
+
+    file_name = f"invoices_store_{batch.store_id}_{batch.date_from}_{batch.date_to}.zip"
+    return StreamingResponse(
+        body(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
     )
@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import schemas, crud_async, database
+from app.utils import order_rows
+from app.utils.pagination import PageParams, build_page, page_params
+from app.routers.orders import ORDER_PAGE, ORDER_VIEW, summary_page
+
+# Async counterparts of the JSON endpoints in orders.py (DB_MODE=async).
+# Invoice endpoints stay on the sync router.
+router = APIRouter(prefix="/orders", tags=["Orders"])
+
+
+# ---------------- Create Order ----------------
+@router.post("/", response_model=schemas.OrderOut)
+async def create_order(order: schemas.OrderCreate, db: AsyncSession = Depends(database.get_async_db)):
+    try:
+        return await crud_async.create_order(db, order)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# ---------------- Get Order by ID ----------------
+@router.get("/{order_id}", response_model=schemas.OrderOut)
+async def get_order(order_id: int, db: AsyncSession = Depends(database.get_async_db)):
+    db_order = await crud_async.get_order(db, order_id)
+    if not db_order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    return db_order
+
+
+# ---------------- Get Orders by Customer ----------------
+@router.get("/by-customer/{customer_id}", response_model=ORDER_PAGE)
+async def get_orders_by_customer(
+    customer_id: int,
+    page: PageParams = Depends(page_params),
+    view: str = ORDER_VIEW,
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    orders = await crud_async.get_orders_by_customer(db, customer_id, page.limit, page.after_id, view)
+    if not orders and page.after_id is None:
+        raise HTTPException(status_code=404, detail="No orders found for this customer")
+    if view == "summary":
+        return summary_page(orders, page.limit)
+    return build_page(orders, page.limit)
+
+
+# ---------------- Get Orders by Store ----------------
+@router.get("/by-store/{store_id}", response_model=ORDER_PAGE)
+async def get_orders_by_store(
+    store_id: int,
+    page: PageParams = Depends(page_params),
+    view: str = ORDER_VIEW,
+    db: AsyncSession = Depends(database.get_async_db)
+):
+    if view == "summary":
+        orders = await crud_async.get_orders_by_store(db, store_id, page.limit, page.after_id, view)
+        if not orders and page.after_id is None:
+            raise HTTPException(status_code=404, detail="No orders found for this store")
+        return summary_page(orders, page.limit)
+    result = await db.run_sync(order_rows.store_orders_page, store_id, page.limit, page.after_id)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No orders found for this store")
+    return order_rows.OrderJSONResponse(result)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app import schemas, models, crud, database
+from app.utils.pagination import PageParams, build_page, page_params
 router = APIRouter(prefix="/owners", tags=["Owners"])
 
 @router.post("/", response_model=schemas.OwnerOut)
@@ -8,9 +9,10 @@ def create_owner(owner: schemas.OwnerCreate, db: Session = Depends(database.get_
     db_owner = crud.create_owner(db, owner)
     return db_owner
 
-@router.get("/", response_model=list[schemas.OwnerOut])
-def list_owners(db: Session = Depends(database.get_db)):
-    return db.query(models.Owner).all()
+@router.get("/", response_model=schemas.Page[schemas.OwnerOut])
+def list_owners(page: PageParams = Depends(page_params), db: Session = Depends(database.get_read_db)):
+    owners = crud.get_owners(db, page.limit, page.after_id)
+    return build_page(owners, page.limit)
 
 
 @router.put("/{owner_id}", response_model=schemas.OwnerOut)
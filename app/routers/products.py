@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+from app import schemas, crud, database, auth
+from app.utils import catalog
+from app.utils.http_cache import etag_matches, not_modified
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+# shared caches may keep the catalog but must revalidate; unchanged catalogs come back as 304
+CATALOG_CACHE_CONTROL = "public, no-cache"
+
+
+# ---------------- Catalog (served from the in-memory snapshot) ----------------
+@router.get("/", response_model=list[schemas.ProductOut])
+def get_products(request: Request, db: Session = Depends(database.get_db)):
+    # primary, not a replica: a rebuild right after a product write must see that write
+    snapshot = catalog.get_catalog(db)
+    if etag_matches(request, snapshot.etag):
+        return not_modified(snapshot.etag, CATALOG_CACHE_CONTROL)
+    return Response(
+        content=snapshot.body,
+        media_type="application/json",
+        headers={"ETag": snapshot.etag, "Cache-Control": CATALOG_CACHE_CONTROL},
+    )
+
+
+# ---------------- Owner → Create product ----------------
+@router.post("/", response_model=schemas.ProductOut)
+def create_product(
+    product: schemas.ProductCreate,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    return crud.create_product(db, product)
+
+
+# ---------------- Owner → Update product ----------------
+@router.put("/{product_id}", response_model=schemas.ProductOut)
+def update_product(
+    product_id: int,
+    product: schemas.ProductCreate,
+    db: Session = Depends(database.get_db),
+    current_owner = Depends(auth.get_current_owner)
+):
+    db_product = crud.update_product(db, product_id, product)
+    if not db_product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return db_product
@@ -1,21 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app import schemas, models, crud, database
+from app import schemas, models, crud, database, auth
+from app.utils import resource_versions, sales_rollup
+from app.utils.http_cache import conditional_get
 
 router = APIRouter(prefix="/stores", tags=["Stores"])
 
 # Dependency
 get_db = database.get_db
+get_read_db = database.get_read_db
+
+# per-user data: browsers may keep it but must revalidate, shared caches must not store it
+STORES_CACHE_CONTROL = "private, no-cache"
 
 # ---------------- Owner → Get all stores ----------------
-@router.get("/", response_model=list[schemas.StoreOut])
-def get_stores(owner_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=list[schemas.StoreOut],
+    dependencies=[Depends(conditional_get(resource_versions.STORES, "owner_id", STORES_CACHE_CONTROL))],
+)
+def get_stores(owner_id: int, db: Session = Depends(get_read_db)):
     stores = crud.get_stores_by_owner(db, owner_id)
     return stores
 
 # ---------------- StoreMan → Get own store ----------------
-@router.get("/me", response_model=schemas.StoreOut)
-def get_my_store(store_id: int, db: Session = Depends(get_db)):
+@router.get(
+    "/me",
+    response_model=schemas.StoreOut,
+    dependencies=[Depends(conditional_get(resource_versions.STORE, "store_id", STORES_CACHE_CONTROL))],
+)
+def get_my_store(store_id: int, db: Session = Depends(get_read_db)):
     store = db.query(models.Store).filter(models.Store.id == store_id).first()
     if not store:
         raise HTTPException(status_code=404, detail="Store not found")
@@ -45,3 +61,39 @@ def delete_store(store_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Store not found")
     return {"message": "Store deleted successfully"}
 
+
+# ---------------- Owner → Sales report (served from the daily rollup) ----------------
+@router.get("/{store_id}/sales", response_model=schemas.SalesReport)
+def get_store_sales(
+    store_id: int,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    db: Session = Depends(get_read_db),
+    current_owner = Depends(auth.get_store_owner)
+):
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    points = sales_rollup.sales_series(db, store_id, date_from, date_to, bucket)
+    return {"store_id": store_id, "bucket": bucket, "date_from": date_from, "date_to": date_to, "points": points}
+
+
+# ---------------- Owner → Best-selling products (served from the daily rollup) ----------------
+@router.get("/{store_id}/top-products", response_model=schemas.TopProductsReport)
+def get_top_products(
+    store_id: int,
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    by: str = Query("quantity", pattern="^(quantity|revenue)$"),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db),
+    current_owner = Depends(auth.get_store_owner)
+):
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="to must not be before from")
+    products = sales_rollup.top_products(db, store_id, date_from, date_to, by, limit)
+    return {"store_id": store_id, "by": by, "date_from": date_from, "date_to": date_to, "products": products}
@@ -1,6 +1,13 @@
-from pydantic import BaseModel
-from datetime import datetime
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from datetime import date, datetime
+from typing import Generic, List, Literal, Optional, TypeVar
+
+T = TypeVar("T")
+
+# ---------------- Pagination ----------------
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # pass back as ?after= to fetch the next page
 
 # ---------------- Products ----------------
 class ProductBase(BaseModel):
@@ -29,8 +36,6 @@ class OwnerCreate(OwnerBase):
 
 class OwnerOut(OwnerBase):
     id: int
-    otp_code: Optional[str] = None
-    otp_expires_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -90,8 +95,10 @@ class OrderItemBase(BaseModel):
     quantity: int
     price: float
 
-class OrderItemCreate(OrderItemBase):
-    pass
+class OrderItemCreate(BaseModel):
+    product_id: int
+    quantity: int = Field(gt=0)
+    price: Optional[float] = None  # ignored: orders are charged at the product's current price
 
 class OrderItemOut(OrderItemBase):
     id: int
@@ -118,6 +125,20 @@ class OrderOut(OrderBase):
     class Config:
         from_attributes = True
 
+class OrderSummary(OrderBase):
+    """Order list row without its items (?view=summary)."""
+    id: int
+    total: float
+    status: str
+    created_at: datetime
+    item_count: int
+
+    class Config:
+        from_attributes = True
+
+class OrderStatusUpdate(BaseModel):
+    status: str = Field(min_length=1, max_length=100)   # "Cancelled" removes the order from sales
+
 
 # ---------------- Token ----------------
 class Token(BaseModel):
@@ -129,6 +150,11 @@ class InvoiceResponse(BaseModel):
     message: str
     file_path: str
 
+class InvoiceBatchRequest(BaseModel):
+    store_id: int
+    date_from: date
+    date_to: date   # inclusive
+
 # ---------------- OTP ----------------
 class OTPRequest(BaseModel):
     mobile: str
@@ -156,6 +182,33 @@ class InquiryOut(InquiryBase):
     class Config:
         from_attributes = True
 
+# ---------------- Sales ----------------
+class SalesPoint(BaseModel):
+    period_start: date
+    orders: int
+    revenue: float
+    items: int
+
+class SalesReport(BaseModel):
+    store_id: int
+    bucket: str
+    date_from: date
+    date_to: date
+    points: List[SalesPoint]
+
+class TopProduct(BaseModel):
+    product_id: int
+    name: Optional[str] = None
+    quantity: int
+    revenue: float
+
+class TopProductsReport(BaseModel):
+    store_id: int
+    by: str
+    date_from: date
+    date_to: date
+    products: List[TopProduct]
+
 # ---------------- Offer ----------------
 class OfferBase(BaseModel):
     title: str
@@ -163,6 +216,8 @@ class OfferBase(BaseModel):
     discount: float   
     valid_until: datetime
     store_id: Optional[int] = None  # None = all stores
+    # None = every customer; otherwise an RFM segment from POST /jobs/customer-segments/{store_id}
+    segment: Optional[Literal["champions", "loyal", "new", "at_risk", "lapsing", "regular"]] = None
    # owner_id: int Optional[int] = None  # None = admin created
 
 class OfferCreate(OfferBase):
@@ -174,3 +229,35 @@ class OfferOut(OfferBase):
     class Config:
         from_attributes = True
 
+class OfferDeliveryOut(BaseModel):
+    offer_id: int
+    status: str
+    total: Optional[int] = None
+    sent: int
+    failed: int
+    messages_per_second: Optional[float] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+# ---------------- Jobs ----------------
+class InvoiceJobCreate(BaseModel):
+    order_ids: List[int] = Field(min_length=1)
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    status: str
+    progress: int
+    total: Optional[int] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+    class Config:
+        from_attributes = True
@@ -0,0 +1,115 @@
+"""
+Versioned in-memory product catalog.
+
+The whole products table is held as one immutable CatalogSnapshot: the products in id order,
+a price lookup for order creation, the serialized JSON body and an ETag over that body.
+Readers grab the current snapshot without locking; crud.create_product / update_product call
+invalidate() and the next reader builds a new one with the next version number. Writes made
+by other processes are picked up by GET /products/ once the snapshot is CATALOG_TTL_SECONDS
+old. Prices charged on orders cannot wait that long: get_prices() first compares the
+snapshot with the shared products counter in resource_versions (one primary-key lookup),
+which those writes bump, and rebuilds when it has moved.
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.utils import resource_versions
+
+
+@dataclass(frozen=True)
+class CatalogProduct:
+    id: int
+    name: str
+    price: float
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    version: int
+    db_version: int             # resource_versions products counter the rows were read at
+    products: Tuple[CatalogProduct, ...]
+    prices: Mapping[int, float]
+    body: bytes                 # JSON list of ProductOut, ready to send
+    etag: str                   # derived from body, so every process agrees on it
+    built_at: float = field(default_factory=time.monotonic, compare=False)
+
+
+_snapshot = None
+_version = 0
+_invalidations = 0
+_lock = threading.Lock()
+
+
+def build(db: Session) -> CatalogSnapshot:
+    """Load every product and publish a new snapshot."""
+    global _snapshot, _version
+    started = _invalidations
+    # read the counter before the rows: a write in between makes the snapshot look stale, never fresh
+    db_version = resource_versions.get_version(db, resource_versions.PRODUCTS, resource_versions.ALL)
+    Product = models.Product
+    rows = db.execute(select(Product.id, Product.name, Product.price).order_by(Product.id)).all()
+    products = tuple(CatalogProduct(*row) for row in rows)
+    body = json.dumps(
+        [{"name": p.name, "price": p.price, "id": p.id} for p in products], separators=(",", ":")
+    ).encode()
+    with _lock:
+        _version += 1
+        snapshot = CatalogSnapshot(
+            version=_version,
+            db_version=db_version,
+            products=products,
+            prices=MappingProxyType({p.id: p.price for p in products}),
+            body=body,
+            etag=f'"catalog-{hashlib.sha256(body).hexdigest()[:32]}"',
+        )
+        # a write committed while we were reading may be missing from rows; don't publish then
+        if _invalidations == started:
+            _snapshot = snapshot
+        return snapshot
+
+
+def get_catalog(db: Session, validate: bool = False) -> CatalogSnapshot:
+    """The current snapshot; with validate, also rebuilt if the products counter has moved."""
+    snapshot = _snapshot
+    if snapshot is None or time.monotonic() - snapshot.built_at > settings.CATALOG_TTL_SECONDS:
+        return build(db)
+    if validate and resource_versions.get_version(
+        db, resource_versions.PRODUCTS, resource_versions.ALL
+    ) != snapshot.db_version:
+        return build(db)
+    return snapshot
+
+
+def invalidate():
+    global _snapshot, _invalidations
+    with _lock:
+        _snapshot = None
+        _invalidations += 1
+
+
+def get_prices(db: Session, product_ids) -> dict:
+    """
+    Prices for product_ids from a validated snapshot. Ids it does not know are looked up in the table
+    (another process may have created them) and, if found there, the snapshot is dropped.
+    Ids that do not exist at all are left out.
+    """
+    prices = get_catalog(db, validate=True).prices
+    found = {pid: prices[pid] for pid in product_ids if pid in prices}
+    missing = set(product_ids) - found.keys()
+    if missing:
+        Product = models.Product
+        rows = db.execute(select(Product.id, Product.price).where(Product.id.in_(missing))).all()
+        if rows:
+            invalidate()
+            found.update(rows)
+    return found
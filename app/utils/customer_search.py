@@ -0,0 +1,91 @@
+"""
+Optional in-memory prefix index for customer typeahead (CUSTOMER_SEARCH_INDEX=1).
+
+Per store, customers are kept as sorted (key, id) lists: lower-cased names, normalized
+phones and reversed phones. A prefix lookup is two bisects plus a slice, so a keystroke
+costs no SQL beyond one primary-key fetch of the few matching rows. An index is built on
+first use, dropped by invalidate(store_id) from the customer write paths in this process,
+and rebuilt after CUSTOMER_SEARCH_INDEX_TTL_SECONDS to pick up writes from other processes.
+Ranking matches crud.search_customers.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.utils.phone import normalize_phone
+
+_MAX_CHAR = "\U0010ffff"
+
+
+class StorePrefixIndex:
+    def __init__(self, rows):
+        """rows: (id, name, phone_normalized) for every customer of one store."""
+        self.names = sorted(((name or "").lower(), cid) for cid, name, _ in rows)
+        self.phones = sorted((phone, cid) for cid, _, phone in rows if phone)
+        self.reversed_phones = sorted((phone[::-1], cid) for cid, _, phone in rows if phone)
+        self.built_at = time.monotonic()
+
+    @staticmethod
+    def _prefix(entries, prefix: str, limit: int):
+        start = bisect_left(entries, (prefix,))
+        end = bisect_left(entries, (prefix + _MAX_CHAR,), lo=start)
+        return [cid for _, cid in entries[start:min(end, start + limit)]]
+
+    def search(self, q: str, limit: int):
+        """Ranked customer ids for q."""
+        q = q.strip()
+        if not q:
+            return []
+        digits = normalize_phone(q)
+        if digits and not any(c.isalpha() for c in q):
+            start = bisect_left(self.phones, (digits,))
+            exact = [cid for phone, cid in self.phones[start:start + limit] if phone == digits]
+            ids = exact + [
+                cid for cid in self._prefix(self.reversed_phones, digits[::-1], limit + len(exact))
+                if cid not in exact
+            ]
+            return ids[:limit]
+        return self._prefix(self.names, q.lower(), limit)
+
+    def __len__(self):
+        return len(self.names)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return settings.CUSTOMER_SEARCH_INDEX
+
+
+def get_index(db: Session, store_id: int) -> StorePrefixIndex:
+    index = _indexes.get(store_id)
+    if index is None or time.monotonic() - index.built_at > settings.CUSTOMER_SEARCH_INDEX_TTL_SECONDS:
+        Customer = models.Customer
+        rows = db.execute(
+            select(Customer.id, Customer.name, Customer.phone_normalized).where(Customer.store_id == store_id)
+        ).all()
+        index = StorePrefixIndex(rows)
+        with _lock:
+            _indexes[store_id] = index
+    return index
+
+
+def invalidate(store_id: int):
+    with _lock:
+        _indexes.pop(store_id, None)
+
+
+def search(db: Session, store_id: int, q: str, limit: int = 20):
+    """Same contract as crud.search_customers, answered from the in-memory index."""
+    ids = get_index(db, store_id).search(q, limit)
+    if not ids:
+        return []
+    rows = {c.id: c for c in db.query(models.Customer).filter(models.Customer.id.in_(ids))}
+    return [rows[cid] for cid in ids if cid in rows]
@@ -1,34 +1,77 @@
 from openpyxl import Workbook
 import os
+import pickle
+from sqlalchemy import select
+
+from app import models
 
 EXPORT_DIR = "exports"
 os.makedirs(EXPORT_DIR, exist_ok=True)
 
-def export_customers_to_excel(customers, file_name="customers.xlsx"):
+CUSTOMER_HEADERS = ["ID", "Name", "Email", "Phone", "Address", "Store ID"]
+
+def export_customer_rows(rows, file_path):
     """
-    Export customers list to Excel file
-    customers = list of Customer model objects
+    Write (id, name, email, phone, address, store_id) tuples to an Excel file.
+    Takes plain tuples so it can run in a worker process.
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Customers"
-
-    # Header Row
-    headers = ["ID", "Name", "Email", "Phone", "Address", "Store ID"]
-    ws.append(headers)
-
-    # Data Rows
-    for cust in customers:
-        ws.append([
-            cust.id,
-            cust.name,
-            cust.email,
-            cust.phone,
-            cust.address,
-            cust.store_id
-        ])
-
-    # Save File
-    file_path = os.path.join(EXPORT_DIR, file_name)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Customers")
+    ws.append(CUSTOMER_HEADERS)
+    for row in rows:
+        ws.append(list(row))
     wb.save(file_path)
     return file_path
+
+
+def iter_customer_batches(db, store_id: int, batch_size: int = 1000):
+    """
+    Yield lists of (id, name, email, phone, address, store_id) tuples for a store, read in
+    keyset pages (WHERE id > last ORDER BY id LIMIT batch_size), so memory stays flat however
+    many customers there are and no cursor stays open between batches.
+    """
+    Customer = models.Customer
+    last_id = 0
+    while True:
+        batch = [tuple(row) for row in db.execute(
+            select(Customer.id, Customer.name, Customer.email, Customer.phone, Customer.address, Customer.store_id)
+            .where(Customer.store_id == store_id, Customer.id > last_id)
+            .order_by(Customer.id)
+            .limit(batch_size)
+        )]
+        if not batch:
+            return
+        last_id = batch[-1][0]
+        yield batch
+
+
+def iter_customer_rows(db, store_id: int, batch_size: int = 1000):
+    """iter_customer_batches(), flattened to one tuple at a time."""
+    for batch in iter_customer_batches(db, store_id, batch_size):
+        yield from batch
+
+
+def spool_batches(batches, spool_path):
+    """Pickle each batch to spool_path in turn; returns the number of rows written."""
+    rows = 0
+    with open(spool_path, "wb") as fh:
+        for batch in batches:
+            pickle.dump(batch, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            rows += len(batch)
+    return rows
+
+
+def read_spool(spool_path):
+    """Rows of a spool_batches() file, one batch in memory at a time."""
+    with open(spool_path, "rb") as fh:
+        while True:
+            try:
+                batch = pickle.load(fh)
+            except EOFError:
+                return
+            yield from batch
+
+
+def export_customer_spool(spool_path, file_path):
+    """export_customer_rows() over a spool file; runs in a worker process."""
+    return export_customer_rows(read_spool(spool_path), file_path)
@@ -1,4 +1,5 @@
 import pandas as pd
+from openpyxl import load_workbook
 
 def parse_file(file_path: str):
     if file_path.endswith(".csv"):
@@ -17,3 +18,45 @@ def parse_file(file_path: str):
             "phone": row["phone"]
         })
     return customers
+
+
+def iter_chunks(file, filename: str, chunk_size: int = 5000):
+    """
+    Yield DataFrames of at most chunk_size rows from a CSV or XLSX file object.
+    All cells are read as strings ("" for blanks) so phone numbers keep their digits.
+    """
+    if filename.endswith(".csv"):
+        yield from pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False)
+    elif filename.endswith(".xlsx"):
+        yield from _iter_xlsx_chunks(file, chunk_size)
+    else:
+        raise ValueError("Unsupported file format. Only CSV and Excel are allowed.")
+
+
+def _iter_xlsx_chunks(file, chunk_size: int):
+    # read_only mode streams rows from the sheet XML instead of building the whole workbook
+    wb = load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        width = len(header)
+        batch = []
+        for row in rows:
+            cells = [_cell(v) for v in row[:width]]
+            cells.extend([""] * (width - len(cells)))
+            batch.append(cells)
+            if len(batch) == chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))  # numeric phone cells come back as 9876543210.0
+    return str(value)
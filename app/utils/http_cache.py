@@ -0,0 +1,77 @@
+import hashlib
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.orm import Session
+
+from app import database
+from app.utils import resource_versions
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True when the request's If-None-Match already names etag (weak comparison, RFC 9110)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str = None) -> Response:
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return Response(status_code=304, headers=headers)
+
+
+# ---------------- Version-validated GETs ----------------
+def _resource_id(request: Request, id_param: str):
+    if id_param is None:
+        return resource_versions.ALL
+    value = request.path_params.get(id_param, request.query_params.get(id_param))
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None   # let the endpoint's own validation reject it
+
+
+def _version_etag(request: Request, scope: str, resource_id: int, version: int) -> str:
+    # the query string (page size, cursor, ...) selects a different representation
+    query = hashlib.sha256(str(sorted(request.query_params.multi_items())).encode()).hexdigest()[:12]
+    return f'W/"{scope}-{resource_id}-{version}-{query}"'
+
+
+def _answer(request: Request, response: Response, etag: str, cache_control: str):
+    if etag_matches(request, etag):
+        # raised, so the endpoint body (the list query and its serialization) never runs
+        raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+
+
+def conditional_get(scope: str, id_param: str = None, cache_control: str = "private, no-cache"):
+    """
+    Dependency for GET endpoints whose data only changes through crud writes that bump
+    (scope, id) in resource_versions. id_param names the path or query parameter holding the
+    resource id; without one the scope's ALL counter is used. Answers If-None-Match with 304
+    after a single version lookup; otherwise sets ETag and Cache-Control on the response.
+    """
+    def check(request: Request, response: Response, db: Session = Depends(database.get_read_db)):
+        resource_id = _resource_id(request, id_param)
+        if resource_id is None:
+            return
+        version = resource_versions.get_version(db, scope, resource_id)
+        _answer(request, response, _version_etag(request, scope, resource_id, version), cache_control)
+    return check
+
+
+def conditional_get_async(scope: str, id_param: str = None, cache_control: str = "private, no-cache"):
+    """conditional_get for the async routers (DB_MODE=async)."""
+    async def check(request: Request, response: Response, db=Depends(database.get_async_db)):
+        resource_id = _resource_id(request, id_param)
+        if resource_id is None:
+            return
+        version = await db.run_sync(resource_versions.get_version, scope, resource_id)
+        _answer(request, response, _version_etag(request, scope, resource_id, version), cache_control)
+    return check
@@ -0,0 +1,83 @@
+"""
+Month-end invoice batches: load a store's orders for a date range in a few set-based
+queries, render the PDFs across the process pool and stream them back as a ZIP.
+"""
+import zipfile
+from collections import deque
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app import models
+from app.utils import invoice_cache, invoice_service
+from app.utils.streaming import StreamBuffer
+
+ORDERS_PER_QUERY = 500
+
+
+def iter_order_snapshots(db, store_id: int, date_from: date, date_to: date, chunk_size: int = ORDERS_PER_QUERY):
+    """
+    Yield invoice snapshots for a store's orders created between date_from and date_to (inclusive).
+    Orders are read in keyset pages; each page costs one query for the orders (+store) and one
+    selectin query each for items+products and customers, whatever the page size.
+    """
+    start = datetime.combine(date_from, time.min)
+    end = datetime.combine(date_to + timedelta(days=1), time.min)
+    last_id = 0
+    while True:
+        orders = (
+            db.query(models.Order)
+            .options(
+                selectinload(models.Order.items).joinedload(models.OrderItem.product),
+                selectinload(models.Order.customer),
+                joinedload(models.Order.store),
+            )
+            .filter(
+                models.Order.store_id == store_id,
+                models.Order.created_at >= start,
+                models.Order.created_at < end,
+                models.Order.id > last_id,
+            )
+            .order_by(models.Order.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not orders:
+            return
+        for order in orders:
+            yield invoice_service.snapshot_order(order)
+        last_id = orders[-1].id
+        db.expunge_all()  # keep the identity map from growing page after page
+
+
+def render_parallel(snapshots, pool, max_in_flight: int):
+    """
+    Render snapshots on pool and yield (order_id, pdf_bytes) as renders finish.
+    At most max_in_flight renders are queued, so memory stays bounded for large batches.
+    Invoices already in the invoice cache are read instead of rendered.
+    """
+    pending = deque()
+    for snapshot in snapshots:
+        cached = invoice_cache.lookup(snapshot)
+        if cached:
+            with open(cached, "rb") as fh:
+                yield snapshot.id, fh.read()
+            continue
+        pending.append((snapshot.id, pool.submit(invoice_service.render_invoice, snapshot)))
+        while len(pending) >= max_in_flight or (pending and pending[0][1].done()):
+            order_id, future = pending.popleft()
+            yield order_id, future.result()
+    while pending:
+        order_id, future = pending.popleft()
+        yield order_id, future.result()
+
+
+def stream_zip(rendered):
+    """Yield ZIP bytes for (order_id, pdf_bytes) pairs, one chunk per finished invoice."""
+    sink = StreamBuffer()
+    # PDFs are already compressed; storing them keeps the ZIP step cheap
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zf:
+        for order_id, pdf in rendered:
+            zf.writestr(f"invoice_{order_id}.pdf", pdf)
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,106 @@
+"""
+Content-addressed cache of rendered invoice PDFs.
+
+A PDF is stored under its order id plus a fingerprint of everything the invoice shows
+(order, items, products, store, customer). Any change to that data yields a new
+fingerprint, so stale PDFs are never served; they age out through size-bounded LRU
+eviction or are dropped eagerly with invalidate(order_id).
+"""
+import glob
+import hashlib
+import json
+import os
+import threading
+import uuid
+from datetime import date, datetime
+from types import SimpleNamespace
+
+from app.config import settings
+from app.utils import invoice_service
+
+CACHE_DIR = os.path.join(invoice_service.UPLOAD_DIR, "cache")
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Bump when the invoice layout changes so every cached PDF is re-rendered
+RENDER_VERSION = 1
+
+_evict_lock = threading.Lock()
+
+
+def _plain(value):
+    if isinstance(value, SimpleNamespace):
+        return {k: _plain(v) for k, v in sorted(vars(value).items())}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def fingerprint(snapshot) -> str:
+    """sha256 of the canonical JSON form of an invoice_service.snapshot_order() result."""
+    payload = json.dumps([RENDER_VERSION, _plain(snapshot)], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def etag_for(snapshot) -> str:
+    return f'"{fingerprint(snapshot)}"'
+
+
+def _path(order_id: int, fp: str) -> str:
+    return os.path.join(CACHE_DIR, f"{order_id}-{fp}.pdf")
+
+
+def lookup(snapshot):
+    """Return the cached PDF path for snapshot if it has already been rendered, else None."""
+    path = _path(snapshot.id, fingerprint(snapshot))
+    return path if os.path.exists(path) else None
+
+
+def get_or_render(snapshot) -> str:
+    """Return the path of the cached PDF for snapshot, rendering it on a miss."""
+    path = _path(snapshot.id, fingerprint(snapshot))
+    if os.path.exists(path):
+        os.utime(path)  # LRU: eviction removes the least recently served files first
+        return path
+
+    # render under a unique name, then rename atomically so readers never see a partial PDF
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    invoice_service.create_invoice(snapshot, tmp_path)
+    os.replace(tmp_path, path)
+    invalidate(snapshot.id, keep=path)
+    evict()
+    return path
+
+
+def invalidate(order_id: int, keep: str = None):
+    """Remove cached PDFs of an order (all of them, or all but keep)."""
+    for path in glob.glob(os.path.join(CACHE_DIR, f"{order_id}-*.pdf")):
+        if path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def evict(max_bytes: int = None):
+    """Delete least recently used PDFs until the cache fits in max_bytes."""
+    max_bytes = settings.INVOICE_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        entries = []
+        total = 0
+        for entry in os.scandir(CACHE_DIR):
+            if entry.is_file() and entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            if total <= max_bytes:
+                break
@@ -2,15 +2,45 @@ from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
+import io
 import os
 from datetime import datetime
+from types import SimpleNamespace
 
 UPLOAD_DIR = "invoices"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
-def create_invoice(order):
-    file_name = f"invoice_{order.id}.pdf"
-    file_path = os.path.join(UPLOAD_DIR, file_name)
+def snapshot_order(order):
+    """
+    Copy the fields create_invoice reads from an ORM order into plain objects, so the
+    invoice can be rendered outside the session (e.g. in a worker process).
+    """
+    def plain(obj, *fields):
+        if obj is None:
+            return None
+        return SimpleNamespace(**{f: getattr(obj, f, None) for f in fields})
+
+    return SimpleNamespace(
+        id=order.id,
+        status=order.status,
+        total=order.total,
+        created_at=order.created_at,
+        store=plain(order.store, "id", "name", "location"),
+        customer=plain(order.customer, "id", "name", "phone", "email", "address"),
+        items=[
+            SimpleNamespace(
+                quantity=item.quantity,
+                price=item.price,
+                product=plain(item.product, "id", "name"),
+            )
+            for item in order.items
+        ],
+    )
+
+
+def create_invoice(order, file_path=None):
+    if file_path is None:
+        file_path = os.path.join(UPLOAD_DIR, f"invoice_{order.id}.pdf")
 
     doc = SimpleDocTemplate(file_path, pagesize=A4)
     styles = getSampleStyleSheet()
@@ -22,8 +52,10 @@ def create_invoice(order):
     story.append(Spacer(1, 12))
 
     # ---------------- Invoice Meta ----------------
+    # dated by the order, not by the render, so the same order always renders the same PDF
+    invoice_date = getattr(order, 'created_at', None) or datetime.now()
     meta_data = [
-        ["Invoice No", f"INV-{order.id}", "Invoice Date", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
+        ["Invoice No", f"INV-{order.id}", "Invoice Date", invoice_date.strftime("%Y-%m-%d %H:%M:%S")],
         ["Payment Status", getattr(order, 'status', 'Pending'), "Store Name", getattr(order.store, 'name', 'N/A')],
     ]
     table = Table(meta_data, colWidths=[100, 200, 100, 200])
@@ -83,3 +115,10 @@ def create_invoice(order):
 
     doc.build(story)
     return file_path
+
+
+def render_invoice(order) -> bytes:
+    """Render an invoice to PDF bytes in memory (picklable entry point for worker processes)."""
+    buffer = io.BytesIO()
+    create_invoice(order, buffer)
+    return buffer.getvalue()
@@ -0,0 +1,121 @@
+"""Handlers for the background job kinds. Importing this module registers them."""
+import os
+import zipfile
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import joinedload
+
+from app import models
+from app.config import settings
+from app.utils import export_service, invoice_service, offer_dispatch, segmentation
+from app.utils.customer_import import import_customers
+from app.utils.job_queue import register
+from app.utils.process_pool import get_process_pool
+
+JOB_OUTPUT_DIR = os.path.join("exports", "jobs")
+EXPORT_BATCH_SIZE = 5000
+os.makedirs(JOB_OUTPUT_DIR, exist_ok=True)
+
+
+@register("customer_import")
+def customer_import(ctx):
+    params = ctx.params
+    try:
+        with open(params["file_path"], "rb") as fh:
+            summary = import_customers(
+                ctx.db, params["store_id"], fh, params["filename"], settings.IMPORT_CHUNK_SIZE,
+                on_progress=lambda s: ctx.report(s["inserted"] + s["rejected"] + s["duplicates"]),
+            )
+    except Exception as e:
+        # a retry needs the upload; once the job will not run again, drop it
+        if not ctx.will_retry(e) and os.path.exists(params["file_path"]):
+            os.remove(params["file_path"])
+        raise
+    os.remove(params["file_path"])
+    if summary["reject_file"]:
+        summary["file"] = os.path.join("uploads", "rejects", summary["reject_file"])
+    return summary
+
+
+@register("customer_export")
+def customer_export(ctx):
+    store_id = ctx.params["store_id"]
+    Customer = models.Customer
+    total = ctx.db.execute(select(func.count()).where(Customer.store_id == store_id)).scalar_one()
+    ctx.report(0, total)
+
+    def batches():
+        done = 0
+        for batch in export_service.iter_customer_batches(ctx.db, store_id, EXPORT_BATCH_SIZE):
+            done += len(batch)
+            ctx.report(done)
+            yield batch
+
+    # rows go to a spool file batch by batch, so neither this thread nor the pool holds them all
+    spool_path = os.path.join(JOB_OUTPUT_DIR, f"job_{ctx.job_id}_customers.spool")
+    file_path = os.path.join(JOB_OUTPUT_DIR, f"job_{ctx.job_id}_customers_store_{store_id}.xlsx")
+    try:
+        exported = export_service.spool_batches(batches(), spool_path)
+        # XLSX encoding is CPU-bound: render in the process pool, keep this thread free for IO
+        ctx.wait(get_process_pool().submit(export_service.export_customer_spool, spool_path, file_path))
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+    ctx.report(exported, exported)
+    return {"file": file_path, "customers": exported}
+
+
+@register("invoices")
+def invoices(ctx):
+    order_ids = ctx.params["order_ids"]
+    orders = (
+        ctx.db.query(models.Order)
+        .options(
+            joinedload(models.Order.items).joinedload(models.OrderItem.product),
+            joinedload(models.Order.store),
+            joinedload(models.Order.customer),
+        )
+        .filter(models.Order.id.in_(order_ids))
+        .all()
+    )
+    ctx.report(0, len(orders))
+
+    pool = get_process_pool()
+    futures = [
+        (order.id, pool.submit(
+            invoice_service.create_invoice,
+            invoice_service.snapshot_order(order),
+            os.path.join(JOB_OUTPUT_DIR, f"job_{ctx.job_id}_invoice_{order.id}.pdf"),
+        ))
+        for order in orders
+    ]
+    zip_path = os.path.join(JOB_OUTPUT_DIR, f"job_{ctx.job_id}_invoices.zip")
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for done, (order_id, future) in enumerate(futures, start=1):
+            pdf_path = ctx.wait(future)
+            zf.write(pdf_path, arcname=f"invoice_{order_id}.pdf")
+            os.remove(pdf_path)
+            ctx.report(done)
+    missing = sorted(set(order_ids) - {order.id for order in orders})
+    return {"file": zip_path, "invoices": len(orders), "missing_order_ids": missing}
+
+
+@register("customer_segments")
+def customer_segments(ctx):
+    return segmentation.segment_store(ctx.db, ctx.params["store_id"], report=ctx.report)
+
+
+@register("offer_dispatch")
+def offer_notifications(ctx):
+    notification_id = ctx.params["notification_id"]
+    try:
+        return offer_dispatch.dispatch(ctx.db, notification_id, ctx.report)
+    except Exception as e:
+        # a retried job resumes from last_customer_id; until then the campaign shows the error
+        ctx.db.rollback()
+        notification = ctx.db.get(models.OfferNotification, notification_id)
+        if notification is not None:
+            notification.status = "failed"
+            notification.error = str(e)[:1000]
+            ctx.db.commit()
+        raise
@@ -0,0 +1,221 @@
+"""
+Database-backed job queue.
+
+Jobs are rows in the jobs table. Worker threads inside the app process claim the oldest
+queued job with SELECT ... FOR UPDATE SKIP LOCKED (MySQL 8 / PostgreSQL); on SQLite, which
+has no row locks, a compare-and-set UPDATE on the status column does the same job. CPU-heavy
+rendering is handed from the worker thread to the shared process pool.
+"""
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def register(kind: str):
+    """Register the function that runs jobs of this kind: handler(ctx) -> result dict."""
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(db: Session, kind: str, params: dict, owner_id: int = None, commit: bool = True) -> models.Job:
+    """
+    Queue a job. With commit=False the job is only flushed, so it becomes visible to workers
+    together with the caller's own writes (transactional outbox).
+    """
+    job = models.Job(kind=kind, params=params, owner_id=owner_id, status="queued")
+    db.add(job)
+    if not commit:
+        db.flush()
+        return job
+    db.commit()
+    db.refresh(job)
+    _wakeup.set()
+    return job
+
+
+def wakeup():
+    """Nudge idle workers to poll now instead of after JOB_POLL_SECONDS."""
+    _wakeup.set()
+
+
+def get_job(db: Session, job_id: int):
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+class JobContext:
+    """What a handler gets: its job id and params, a session, and a way to report progress."""
+
+    def __init__(self, job: models.Job, db: Session):
+        self.job_id = job.id
+        self.params = job.params or {}
+        self.owner_id = job.owner_id
+        self.attempts = job.attempts
+        self.db = db
+
+    def report(self, progress: int, total: int = None):
+        # separate short session so progress is visible even while the handler's transaction is open
+        values = {"progress": progress, "locked_at": _now()}
+        if total is not None:
+            values["total"] = total
+        with SessionLocal() as db:
+            db.execute(update(models.Job).where(models.Job.id == self.job_id).values(**values))
+            db.commit()
+
+    def heartbeat(self):
+        """Refresh the lease without touching progress."""
+        with SessionLocal() as db:
+            db.execute(update(models.Job).where(models.Job.id == self.job_id).values(locked_at=_now()))
+            db.commit()
+
+    def wait(self, future):
+        """future.result(), heartbeating meanwhile so long pool work is not reclaimed as abandoned."""
+        interval = max(1.0, settings.JOB_LEASE_SECONDS / 3)
+        while True:
+            try:
+                return future.result(timeout=interval)
+            except FutureTimeout:
+                self.heartbeat()
+
+    def will_retry(self, error: Exception) -> bool:
+        """Whether run_job will requeue this job after error."""
+        return will_retry(self.attempts, error)
+
+
+def will_retry(attempts: int, error: Exception) -> bool:
+    # ValueError means bad input: retrying cannot help
+    return attempts < settings.JOB_MAX_ATTEMPTS and not isinstance(error, ValueError)
+
+
+def _now():
+    return datetime.utcnow()
+
+
+def claim_next(db: Session, worker_id: str):
+    """
+    Claim the oldest runnable job for worker_id, or return None when the queue is empty.
+    An abandoned lease is reclaimed only while the job has attempts left; a job that has used
+    them all (its handler keeps killing or hanging the worker) is marked failed instead.
+    """
+    Job = models.Job
+    stale = _now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    expired = (Job.status == "running") & (Job.locked_at < stale)   # abandoned lease
+    exhausted = expired & (Job.attempts >= settings.JOB_MAX_ATTEMPTS)
+    runnable = or_(Job.status == "queued", expired & (Job.attempts < settings.JOB_MAX_ATTEMPTS))
+    skip_locked = db.get_bind().dialect.name in ("mysql", "mariadb", "postgresql")
+
+    for _ in range(5):
+        query = select(Job).where(or_(runnable, exhausted)).order_by(Job.id).limit(1)
+        if skip_locked:
+            query = query.with_for_update(skip_locked=True)
+        job = db.execute(query).scalar_one_or_none()
+        if job is None:
+            db.rollback()
+            return None
+
+        if job.status == "running" and job.attempts >= settings.JOB_MAX_ATTEMPTS:
+            db.execute(
+                update(Job)
+                .where(Job.id == job.id, exhausted)
+                .values(status="failed", locked_by=None, finished_at=_now(),
+                        error=f"Lease expired on attempt {job.attempts}; the worker died or hung")
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            logger.error("Job %s (%s) failed: lease expired after %s attempts", job.id, job.kind, job.attempts)
+            continue
+
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == job.status, runnable)
+            .values(
+                status="running",
+                locked_by=worker_id,
+                locked_at=_now(),
+                started_at=job.started_at or _now(),
+                attempts=Job.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            db.refresh(job)
+            return job
+        # another worker won the compare-and-set (SQLite path); try the next one
+    return None
+
+
+def run_job(job: models.Job, db: Session, worker_id: str):
+    handler = HANDLERS.get(job.kind)
+    values = {"finished_at": _now(), "locked_by": None}
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job kind: {job.kind}")
+        result = handler(JobContext(job, db)) or {}
+        values.update(status="done", result=result, result_path=result.get("file"))
+    except Exception as e:
+        db.rollback()
+        logger.error("Job %s (%s) failed:\n%s", job.id, job.kind, traceback.format_exc())
+        retry = will_retry(job.attempts, e)
+        values.update(status="queued" if retry else "failed", error=str(e)[:1000], finished_at=None)
+    # fenced on the lease: if the job was reclaimed meanwhile, the new holder's outcome wins
+    finished = db.execute(
+        update(models.Job).where(models.Job.id == job.id, models.Job.locked_by == worker_id).values(**values)
+    ).rowcount
+    db.commit()
+    if not finished:
+        logger.warning("Job %s lost its lease to another worker; discarding this run's outcome", job.id)
+
+
+# ---------------- Worker threads ----------------
+_wakeup = threading.Event()
+_stop = threading.Event()
+_threads = []
+
+
+def _worker_loop(worker_id: str):
+    while not _stop.is_set():
+        try:
+            with SessionLocal() as db:
+                job = claim_next(db, worker_id)
+                if job is not None:
+                    run_job(job, db, worker_id)
+                    continue
+        except Exception:
+            logger.exception("Job worker %s crashed while polling", worker_id)
+        _wakeup.wait(settings.JOB_POLL_SECONDS)
+        _wakeup.clear()
+
+
+def start_workers(count: int = None):
+    count = settings.JOB_WORKERS if count is None else count
+    _stop.clear()
+    for i in range(count):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{i}"
+        thread = threading.Thread(target=_worker_loop, args=(worker_id,), name=f"job-worker-{i}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_workers(timeout: float = 10):
+    _stop.set()
+    _wakeup.set()
+    for thread in _threads:
+        thread.join(timeout)
+    _threads.clear()
@@ -0,0 +1,241 @@
+"""
+Request and database instrumentation, exposed as Prometheus text on GET /metrics.
+
+* MetricsMiddleware times every request per route template (/orders/{order_id}, not the
+  raw path), counts responses by status and adds a Server-Timing header:
+  app;dur=<ms>, db;dur=<ms>;desc="<n> queries", pool;dur=<ms>.
+* instrument_engine() hooks an Engine's cursor events to count queries and time them, both
+  globally and for the request being served, and times connection checkouts from the pool.
+  Statements slower than SLOW_QUERY_MS are logged to the "app.slow_query" logger, a
+  SLOW_QUERY_SAMPLE_RATE fraction of them with the SQL text (never the parameters).
+
+The per-request totals live in a ContextVar set by the middleware; sync endpoints run in a
+worker thread with a copy of that context, so they add to the same RequestStats.
+"""
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_query")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+# ---------------- Registry ----------------
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f"{self.name}{_labels(self.label_names, labels)} {value}"
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}   # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        index = bisect_left(self.buckets, value)   # first bucket with upper bound >= value
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def samples(self):
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        names = self.label_names + ("le",)
+        for labels, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            yield f"{self.name}_bucket{_labels(names, labels + ('+Inf',))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+http_requests = registry.counter(
+    "http_requests_total", "HTTP responses by route template and status", ("method", "route", "status"))
+http_duration = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route"))
+http_db_queries = registry.histogram(
+    "http_request_db_queries", "SQL statements issued per request", ("method", "route"), COUNT_BUCKETS)
+http_db_time = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL per request", ("method", "route"))
+db_queries = registry.counter("db_queries_total", "SQL statements executed", ("engine",))
+db_duration = registry.histogram("db_query_duration_seconds", "SQL statement latency", ("engine",))
+db_slow_queries = registry.counter(
+    "db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS", ("engine",))
+db_pool_wait = registry.histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool", ("engine",))
+
+
+# ---------------- Per-request totals ----------------
+class RequestStats:
+    __slots__ = ("queries", "db_seconds", "pool_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.pool_seconds = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    return _current.get()
+
+
+# ---------------- SQLAlchemy hooks ----------------
+def instrument_engine(engine, name: str):
+    """Count and time engine's statements and pool checkouts under the label name."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_queries.inc(name)
+        db_duration.observe(elapsed, name)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+            db_slow_queries.inc(name)
+            if random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+                logger.warning("slow query on %s: %.1f ms: %s", name, elapsed * 1000, " ".join(statement.split()))
+            else:
+                logger.warning("slow query on %s: %.1f ms", name, elapsed * 1000)
+
+    @event.listens_for(engine, "handle_error")
+    def _failed(context):
+        if context.connection is not None and context.connection.info.get("query_started"):
+            context.connection.info["query_started"].pop()
+
+    # the pool has no "checkout requested" event, so time the call that waits on it
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            waited = time.perf_counter() - started
+            db_pool_wait.observe(waited, name)
+            stats = _current.get()
+            if stats is not None:
+                stats.pool_seconds += waited
+
+    engine.raw_connection = timed_raw_connection
+
+
+# ---------------- ASGI middleware ----------------
+class MetricsMiddleware:
+    """Plain ASGI middleware (no BaseHTTPMiddleware), so streaming responses pass straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                app_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'app;dur={app_ms:.1f}, db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                    f"pool;dur={stats.pool_seconds * 1000:.1f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            # unmatched paths share one label so random URLs cannot blow up the series count
+            template = getattr(route, "path", None) or "<unmatched>"
+            method = scope["method"]
+            http_requests.inc(method, template, str(status))
+            http_duration.observe(time.perf_counter() - started, method, template)
+            http_db_queries.observe(stats.queries, method, template)
+            http_db_time.observe(stats.db_seconds, method, template)
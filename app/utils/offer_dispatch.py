@@ -0,0 +1,96 @@
+"""
+Dispatcher for offer SMS campaigns.
+
+Runs as the "offer_dispatch" background job for one offer_notifications outbox row.
+Recipients are read in keyset batches (WHERE id > last ORDER BY id LIMIT n) rather than
+through one long-lived cursor, so no transaction stays open while a rate-limited provider
+is sending, and a crashed campaign resumes from last_customer_id without resending.
+"""
+import time
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.utils.sms import Message, RateLimiter, get_provider, send_with_retries
+
+
+def offer_message(offer: models.Offer) -> str:
+    return f"{offer.title} - {offer.description} (Valid till {offer.valid_until})"
+
+
+def recipients_filter(offer: models.Offer):
+    """WHERE clause selecting the customers an offer goes to."""
+    Customer = models.Customer
+    conditions = [Customer.phone.isnot(None), Customer.phone != ""]
+    if offer.store_id:
+        conditions.append(Customer.store_id == offer.store_id)
+    if offer.segment:
+        Segment = models.CustomerSegment
+        conditions.append(Customer.id.in_(select(Segment.customer_id).where(Segment.segment == offer.segment)))
+    return conditions
+
+
+def dispatch(db: Session, notification_id: int, report=None, batch_size: int = None) -> dict:
+    batch_size = batch_size or settings.SMS_BATCH_SIZE
+    notification = db.get(models.OfferNotification, notification_id)
+    if notification is None:
+        raise ValueError(f"Offer notification {notification_id} not found")
+    if notification.status == "done":
+        return _summary(notification)
+    offer = db.get(models.Offer, notification.offer_id)
+    Customer = models.Customer
+
+    if notification.total is None:
+        notification.total = db.execute(
+            select(func.count()).select_from(Customer).where(*recipients_filter(offer))
+        ).scalar_one()
+    notification.status = "sending"
+    notification.started_at = notification.started_at or datetime.utcnow()
+    db.commit()
+
+    provider = get_provider()
+    limiter = RateLimiter(settings.SMS_RATE_PER_SECOND)
+    body = offer_message(offer)
+    processed = 0
+    started = time.perf_counter()
+
+    while True:
+        batch = db.execute(
+            select(Customer.id, Customer.phone)
+            .where(*recipients_filter(offer), Customer.id > notification.last_customer_id)
+            .order_by(Customer.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        messages = [Message(phone, body, customer_id) for customer_id, phone in batch]
+        delivered, failed = send_with_retries(provider, messages, limiter, settings.SMS_MAX_RETRIES)
+
+        notification.sent += delivered
+        notification.failed += failed
+        notification.last_customer_id = batch[-1][0]
+        processed += len(messages)
+        elapsed = time.perf_counter() - started
+        notification.messages_per_second = round(processed / elapsed, 1) if elapsed else None
+        db.commit()
+        if report:
+            report(notification.sent + notification.failed, notification.total)
+
+    notification.status = "done"
+    notification.finished_at = datetime.utcnow()
+    db.commit()
+    return _summary(notification)
+
+
+def _summary(notification: models.OfferNotification) -> dict:
+    return {
+        "notification_id": notification.id,
+        "offer_id": notification.offer_id,
+        "total": notification.total,
+        "sent": notification.sent,
+        "failed": notification.failed,
+        "messages_per_second": notification.messages_per_second,
+    }
@@ -1,21 +1,252 @@
-import random, time
+"""
+One-time passwords for owner / storeman login.
 
-otp_store = {}
+Codes live in a pluggable store selected by OTP_BACKEND:
 
-def generate_otp(mobile: str) -> str:
-    otp = str(random.randint(100000, 999999))
-    otp_store[mobile] = {"otp": otp, "expires": time.time() + 300}
-    print(f"DEBUG OTP for {mobile}: {otp}")  # Replace with SMS
+* "db"     - the otp_codes table; shared by every worker process (default).
+* "memory" - a dict in this process with a heap-driven expiry sweep; for single-process
+             development and tests only, other workers cannot see its codes.
+
+Only an HMAC of the code is stored. Each mobile may request OTP_MAX_REQUESTS codes per
+OTP_REQUEST_WINDOW_SECONDS, and a code is discarded after OTP_MAX_ATTEMPTS wrong guesses.
+"""
+import hashlib
+import heapq
+import hmac
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+
+from app import models
+from app.config import settings
+from app.database import SessionLocal
+
+
+class OTPRateLimited(Exception):
+    """Too many OTP requests for this mobile in the current window."""
+
+
+def _key(role: str, mobile: str) -> str:
+    return f"{role}:{mobile}"
+
+
+def _hash(key: str, code: str) -> str:
+    return hmac.new(settings.SECRET_KEY.encode(), f"{key}:{code}".encode(), hashlib.sha256).hexdigest()
+
+
+# ---------------- Backends ----------------
+class OTPStore(ABC):
+    """
+    Storage for codes and request counters. Every method is atomic for its key, so verification
+    stays one-time and limits hold even when several workers share the store.
+    """
+
+    @abstractmethod
+    def issue(self, key: str, code_hash: str, ttl: float, window: float, max_requests: int) -> bool:
+        """Count a request and store a new code (resetting attempts). False when rate limited."""
+
+    @abstractmethod
+    def consume(self, key: str, code_hash: str) -> bool:
+        """Delete and accept the code if it matches and has not expired."""
+
+    @abstractmethod
+    def fail(self, key: str, max_attempts: int):
+        """Record a wrong guess; the code is dropped once max_attempts is reached."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Remove expired entries; returns how many were removed."""
+
+
+class MemoryOTPStore(OTPStore):
+    def __init__(self):
+        self._codes = {}      # key -> [code_hash, expires_at, attempts]
+        self._windows = {}    # key -> [window_ends_at, requests]
+        self._expiry = []     # heap of (expires_at, kind, key); stale entries are skipped
+        self._lock = threading.Lock()
+
+    def issue(self, key, code_hash, ttl, window, max_requests):
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            counter = self._windows.get(key)
+            if counter is None or counter[0] <= now:
+                counter = self._windows[key] = [now + window, 0]
+                heapq.heappush(self._expiry, (counter[0], "window", key))
+            if counter[1] >= max_requests:
+                return False
+            counter[1] += 1
+            self._codes[key] = [code_hash, now + ttl, 0]
+            heapq.heappush(self._expiry, (now + ttl, "code", key))
+            return True
+
+    def consume(self, key, code_hash):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is None or entry[1] <= now or not hmac.compare_digest(entry[0], code_hash):
+                return False
+            del self._codes[key]
+            return True
+
+    def fail(self, key, max_attempts):
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is not None:
+                entry[2] += 1
+                if entry[2] >= max_attempts:
+                    del self._codes[key]
+
+    def sweep(self):
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now: float) -> int:
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, kind, key = heapq.heappop(self._expiry)
+            table = self._codes if kind == "code" else self._windows
+            entry = table.get(key)
+            # only drop the entry this heap item was pushed for, not a newer one for the same key
+            if entry is not None and entry[1 if kind == "code" else 0] == expires_at:
+                del table[key]
+                removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._codes)
+
+
+class DBOTPStore(OTPStore):
+    """Backed by the otp_codes table, one row per role:mobile; short transactions of its own."""
+
+    sweep_interval = 60   # seconds between opportunistic sweeps from issue()
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._last_sweep = time.monotonic()
+
+    def issue(self, key, code_hash, ttl, window, max_requests):
+        allowed = self._issue(key, code_hash, ttl, window, max_requests)
+        if time.monotonic() - self._last_sweep > self.sweep_interval:
+            self._last_sweep = time.monotonic()
+            self.sweep()
+        return allowed
+
+    def _issue(self, key, code_hash, ttl, window, max_requests):
+        OTPCode = models.OTPCode
+        now = datetime.utcnow()
+        values = {"code_hash": code_hash, "expires_at": now + timedelta(seconds=ttl), "attempts": 0}
+        with self.session_factory() as db:
+            for _ in range(2):
+                # open a new window if the old one ended, otherwise count within it
+                renewed = db.execute(
+                    update(OTPCode)
+                    .where(OTPCode.key == key, OTPCode.window_started_at <= now - timedelta(seconds=window))
+                    .values(window_started_at=now, requests=1, **values)
+                ).rowcount
+                counted = renewed or db.execute(
+                    update(OTPCode)
+                    .where(OTPCode.key == key, OTPCode.requests < max_requests)
+                    .values(requests=OTPCode.requests + 1, **values)
+                ).rowcount
+                if counted:
+                    db.commit()
+                    return True
+                if db.get(OTPCode, key) is not None:
+                    db.rollback()
+                    return False
+                try:
+                    db.execute(insert(OTPCode).values(key=key, window_started_at=now, requests=1, **values))
+                    db.commit()
+                    return True
+                except IntegrityError:
+                    db.rollback()   # another worker inserted the row first; count against it
+            return False
+
+    def consume(self, key, code_hash):
+        OTPCode = models.OTPCode
+        with self.session_factory() as db:
+            # clearing the code in one conditional UPDATE keeps it one-time across workers
+            used = db.execute(
+                update(OTPCode)
+                .where(OTPCode.key == key, OTPCode.code_hash == code_hash, OTPCode.expires_at > datetime.utcnow())
+                .values(code_hash=None, expires_at=None, attempts=0)
+            ).rowcount
+            db.commit()
+            return bool(used)
+
+    def fail(self, key, max_attempts):
+        OTPCode = models.OTPCode
+        with self.session_factory() as db:
+            db.execute(
+                update(OTPCode)
+                .where(OTPCode.key == key, OTPCode.code_hash.isnot(None))
+                .values(attempts=OTPCode.attempts + 1)
+            )
+            db.execute(
+                update(OTPCode)
+                .where(OTPCode.key == key, OTPCode.attempts >= max_attempts)
+                .values(code_hash=None, expires_at=None)
+            )
+            db.commit()
+
+    def sweep(self):
+        OTPCode = models.OTPCode
+        now = datetime.utcnow()
+        window_start = now - timedelta(seconds=settings.OTP_REQUEST_WINDOW_SECONDS)
+        with self.session_factory() as db:
+            removed = db.execute(
+                delete(OTPCode).where(
+                    (OTPCode.expires_at.is_(None)) | (OTPCode.expires_at <= now),
+                    OTPCode.window_started_at <= window_start,
+                )
+            ).rowcount
+            db.commit()
+            return removed
+
+
+BACKENDS = {
+    "memory": MemoryOTPStore,
+    "db": DBOTPStore,
+}
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> OTPStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if settings.OTP_BACKEND not in BACKENDS:
+                    raise ValueError(f"Unknown OTP backend: {settings.OTP_BACKEND}")
+                _store = BACKENDS[settings.OTP_BACKEND]()
+    return _store
+
+
+# ---------------- Service ----------------
+def generate_otp(role: str, mobile: str, store: OTPStore = None) -> str:
+    """Create and store a new code for role/mobile. Raises OTPRateLimited."""
+    store = get_store() if store is None else store
+    key = _key(role, mobile)
+    otp = f"{secrets.randbelow(10 ** settings.OTP_LENGTH):0{settings.OTP_LENGTH}d}"
+    if not store.issue(key, _hash(key, otp), settings.OTP_TTL_SECONDS,
+                       settings.OTP_REQUEST_WINDOW_SECONDS, settings.OTP_MAX_REQUESTS):
+        raise OTPRateLimited(f"Too many OTP requests for {mobile}, try again later")
     return otp
 
-def verify_otp(mobile: str, otp: str) -> bool:
-    data = otp_store.get(mobile)
-    if not data:
-        return False
-    if time.time() > data["expires"]:
-        del otp_store[mobile]
-        return False
-    if data["otp"] == otp:
-        del otp_store[mobile]
+
+def verify_otp(role: str, mobile: str, otp: str, store: OTPStore = None) -> bool:
+    store = get_store() if store is None else store
+    key = _key(role, mobile)
+    if store.consume(key, _hash(key, otp)):
         return True
+    store.fail(key, settings.OTP_MAX_ATTEMPTS)
     return False
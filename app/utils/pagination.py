@@ -0,0 +1,68 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+@dataclass(frozen=True)
+class PageParams:
+    limit: int
+    after_id: Optional[int] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the id of the last row on a page into an opaque cursor."""
+    raw = json.dumps({"id": last_id}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return int(data["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def keyset(query, column, limit=None, after_id=None):
+    """
+    Apply keyset pagination to a query: WHERE column > after_id ORDER BY column LIMIT limit + 1.
+    One extra row is fetched so build_page can tell whether another page exists.
+    """
+    if after_id is not None:
+        query = query.filter(column > after_id)
+    query = query.order_by(column)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return query
+
+
+def build_page(rows, limit: int) -> dict:
+    """Trim rows fetched by keyset() to one page and attach the cursor for the next one."""
+    rows = list(rows)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return {"items": rows, "next_cursor": encode_cursor(last["id"] if isinstance(last, dict) else last.id)}
+    return {"items": rows, "next_cursor": None}
+
+
+def page_params(
+    limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT),
+    after: Optional[str] = Query(None, description="Cursor returned as next_cursor by the previous page"),
+) -> PageParams:
+    """FastAPI dependency parsing ?limit=&after= into PageParams."""
+    if after is None:
+        return PageParams(limit=limit)
+    try:
+        return PageParams(limit=limit, after_id=decode_cursor(after))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,16 @@
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone):
+    """Digits only, the form customer phones are stored, indexed and searched in."""
+    if phone is None:
+        return None
+    return _NON_DIGITS.sub("", str(phone)) or None
+
+
+def reverse_phone(phone):
+    """Normalized phone reversed, so a suffix search becomes an indexable prefix search."""
+    normalized = normalize_phone(phone)
+    return normalized[::-1] if normalized else None
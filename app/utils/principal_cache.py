@@ -0,0 +1,98 @@
+"""
+In-process cache of authenticated principals.
+
+Resolving a JWT used to cost a SELECT for the owner / storeman on every request. The cache maps
+(role, sub) to a small immutable Principal for up to PRINCIPAL_CACHE_TTL_SECONDS. An owner's
+principal carries the ids of their stores, together with the owner's STORES counter in
+resource_versions at the time they were read. crud.update_owner / delete_owner and the store
+create/update/delete paths evict the entry in their own process and bump that counter, so
+auth only trusts a cached owner after one primary-key lookup shows the counter unchanged:
+a store transferred or deleted by another process is never authorized from a stale entry.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as seen by the routers: detached from any DB session."""
+    role: str
+    id: int
+    name: str
+    mobile: str
+    store_id: Optional[int] = None            # storeman only
+    store_ids: FrozenSet[int] = frozenset()   # owner only: the stores they own
+    stores_version: int = 0                   # owner only: STORES version store_ids was read at
+
+
+def owner_principal(owner, store_ids=(), stores_version: int = 0) -> Principal:
+    return Principal(role="owner", id=owner.id, name=owner.name, mobile=owner.mobile,
+                     store_ids=frozenset(store_ids), stores_version=stores_version)
+
+
+def storeman_principal(storeman) -> Principal:
+    return Principal(role="storeman", id=storeman.id, name=storeman.name, mobile=storeman.mobile,
+                     store_id=storeman.store_id)
+
+
+class PrincipalCache:
+    """Bounded LRU with a per-entry TTL, safe to share between request threads."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()   # (role, id) -> (expires_at, principal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, role: str, user_id: int) -> Optional[Principal]:
+        key = (role, user_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, principal: Principal):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        key = (principal.role, principal.id)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, role: str, user_id: int):
+        with self._lock:
+            self._entries.pop((role, user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
@@ -0,0 +1,25 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from app.config import settings
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound rendering (PDF invoices, XLSX files)."""
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=max(1, settings.JOB_PROCESSES))
+    return _pool
+
+
+def shutdown_process_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
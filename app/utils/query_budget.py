@@ -0,0 +1,188 @@
+"""
+Per-endpoint query budgets and N+1 detection.
+
+Every ENDPOINT_BUDGETS entry is requested once through TestClient against a seeded SQLite
+in-memory database while the statements it sends are recorded with engine events. An
+endpoint fails when it issues more statements than its budget, or when the same statement
+shape (SQL with IN lists collapsed, parameters ignored) is sent more than once, which is
+how a per-row lazy load shows up. Caches in front of the database (principal cache,
+catalog snapshot) are cleared before each request so budgets hold for a cold request; owner
+routes include the STORES version read that guards the principal cache.
+
+Usage:
+    python -m app.utils.query_budget        # exits 1 and lists offenders with their SQL
+
+or from a test:
+    assert_within_budgets()
+"""
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+# (method, url, budget, needs owner token, JSON body); ids refer to the data seed() creates
+ENDPOINT_BUDGETS = [
+    ("GET", "/owners/", 1, False, None),
+    ("GET", "/stores/?owner_id=1", 2, False, None),
+    ("GET", "/stores/me?store_id=1", 2, False, None),
+    ("GET", "/stores/1/sales?from=2026-01-01&to=2026-01-31", 4, True, None),
+    ("GET", "/stores/1/top-products?from=2026-01-01&to=2026-01-31", 5, True, None),
+    ("GET", "/products/", 2, False, None),
+    ("GET", "/customers/by-store/1", 4, True, None),
+    ("GET", "/customers/search?store_id=1&q=Cust", 4, True, None),
+    ("GET", "/orders/1", 1, False, None),
+    ("GET", "/orders/by-customer/1?view=detail", 3, False, None),
+    ("GET", "/orders/by-customer/1?view=summary", 1, False, None),
+    ("GET", "/orders/by-store/1?view=detail", 2, False, None),
+    ("GET", "/orders/by-store/1?view=summary", 1, False, None),
+    ("GET", "/inquiries/by-store/1", 4, True, None),
+    ("GET", "/offers/", 2, False, None),
+    ("GET", "/offers/by-store/1", 2, False, None),
+    ("POST", "/orders/", 8, False,
+     {"store_id": 1, "customer_id": 1, "items": [{"product_id": 1, "quantity": 1}, {"product_id": 2, "quantity": 2}]}),
+    ("PATCH", "/orders/1/status", 9, True, {"status": "Cancelled"}),
+    ("POST", "/customers/", 5, True, {"name": "Walk-in", "phone": "9000000099", "store_id": 1}),
+]
+
+STORES, CUSTOMERS, PRODUCTS, ORDERS, ITEMS = 2, 5, 4, 6, 3
+
+
+def statement_shape(statement: str) -> str:
+    """SQL with whitespace normalized and IN (?, ?, ...) lists collapsed, for repeat detection."""
+    shape = " ".join(statement.split())
+    return re.sub(r"IN \((?:\?|%s|:\w+)(?:, ?(?:\?|%s|:\w+))*\)", "IN (?)", shape)
+
+
+@contextmanager
+def record_statements(engine):
+    """Collect every statement sent to engine inside the block (executemany counts once)."""
+    recorded = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        recorded.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield recorded
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def repeated_shapes(statements):
+    """Shapes sent more than once, with their counts."""
+    return {shape: n for shape, n in Counter(map(statement_shape, statements)).items() if n > 1}
+
+
+def seed(db):
+    """A small store network with several rows per relationship, so per-row loads repeat."""
+    from app import models
+
+    owner = models.Owner(name="Owner", mobile="9000000000", password_hash="", shop_name="Budget")
+    db.add(owner)
+    db.flush()
+    stores = [models.Store(name=f"Store {i}", location="Pune", owner_id=owner.id) for i in range(STORES)]
+    products = [models.Product(name=f"Product {i}", price=10.0 + i) for i in range(PRODUCTS)]
+    db.add_all(stores + products)
+    db.flush()
+    customers = [models.Customer(name=f"Customer {i}", phone=f"98765{i:05d}", store_id=stores[0].id)
+                 for i in range(CUSTOMERS)]
+    db.add_all(customers)
+    db.flush()
+    day = datetime(2026, 1, 10)
+    for i in range(ORDERS):
+        order = models.Order(store_id=stores[0].id, customer_id=customers[0].id, total=0.0,
+                             status="Pending", created_at=day + timedelta(hours=i))
+        order.items = [models.OrderItem(product_id=products[(i + j) % PRODUCTS].id, quantity=1 + j,
+                                        price=products[(i + j) % PRODUCTS].price) for j in range(ITEMS)]
+        order.total = sum(item.quantity * item.price for item in order.items)
+        db.add(order)
+    db.add_all(
+        [models.Inquiry(customer_id=c.id, store_id=stores[0].id, subject="Hours", message="Open on Sunday?")
+         for c in customers]
+        + [models.Offer(title=f"Offer {i}", description="", discount=5 + i,
+                        valid_until=day + timedelta(days=30), store_id=stores[i % STORES].id) for i in range(4)]
+    )
+    db.commit()
+
+    from app.utils import sales_rollup
+    sales_rollup.backfill(db)
+    return owner.id
+
+
+def check_budgets():
+    """Run every ENDPOINT_BUDGETS entry; return (method, url, problem, statements) offenders."""
+    from fastapi.testclient import TestClient
+
+    from app import auth, database
+    from app.main import app
+    from app.utils import catalog
+    from app.utils.principal_cache import principal_cache
+
+    # one shared connection, so every worker thread sees the same in-memory database
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    database.Base.metadata.create_all(bind=engine)
+    database.SessionLocal.configure(bind=engine)
+
+    def get_test_db():
+        db = database.SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[database.get_db] = get_test_db
+    app.dependency_overrides[database.get_read_db] = get_test_db
+    offenders = []
+    try:
+        with database.SessionLocal() as db:
+            owner_id = seed(db)
+        headers = {"Authorization": "Bearer " + auth.create_access_token({"sub": str(owner_id), "role": "owner"})}
+        client = TestClient(app)   # no lifespan: background job workers stay off
+        for method, url, budget, needs_auth, body in ENDPOINT_BUDGETS:
+            principal_cache.clear()
+            catalog.invalidate()
+            with record_statements(engine) as statements:
+                response = client.request(method, url, json=body, headers=headers if needs_auth else None)
+            if response.status_code >= 400:
+                offenders.append((method, url, f"HTTP {response.status_code}: {response.text[:200]}", statements))
+            elif len(statements) > budget:
+                offenders.append((method, url, f"{len(statements)} statements, budget {budget}", statements))
+            else:
+                repeats = repeated_shapes(statements)
+                if repeats:
+                    worst = max(repeats.values())
+                    offenders.append((method, url, f"same statement sent {worst} times (N+1?)",
+                                      [s for s in statements if statement_shape(s) in repeats]))
+    finally:
+        app.dependency_overrides.pop(database.get_db, None)
+        app.dependency_overrides.pop(database.get_read_db, None)
+        database.SessionLocal.configure(bind=database.engine)
+        engine.dispose()
+    return offenders
+
+
+def assert_within_budgets():
+    """Raise AssertionError listing every endpoint over budget or repeating a statement."""
+    offenders = check_budgets()
+    if offenders:
+        lines = []
+        for method, url, problem, statements in offenders:
+            lines.append(f"{method} {url}: {problem}")
+            lines.extend(f"    {' '.join(statement.split())}" for statement in statements)
+        raise AssertionError("Query budget violations:\n" + "\n".join(lines))
+
+
+if __name__ == "__main__":
+    try:
+        assert_within_budgets()
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    print(f"OK: {len(ENDPOINT_BUDGETS)} endpoints within their query budgets")
@@ -0,0 +1,128 @@
+"""
+Query-plan regression checks for the read queries in app.crud.
+
+Every crud read is executed once while its SQL is captured, then each captured SELECT is
+run through EXPLAIN (MySQL) / EXPLAIN QUERY PLAN (SQLite). A query whose plan reads a whole
+table instead of going through an index fails the check.
+
+Usage:
+    python -m app.utils.query_plan          # exits 1 and lists offenders on regression
+
+or from a test:
+    assert_no_full_scans(SessionLocal())
+"""
+import sys
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app import crud
+from app.utils import order_rows
+
+# (name, call, scan allowed) -- unfiltered list pages and small lookup tables may scan
+CRUD_READS = [
+    ("get_owners", lambda db: crud.get_owners(db, 50), True),
+    ("get_owner_by_id", lambda db: crud.get_owner_by_id(db, 1), False),
+    ("get_owner_by_mobile", lambda db: crud.get_owner_by_mobile(db, "0000000000"), False),
+    ("get_storeman_by_id", lambda db: crud.get_storeman_by_id(db, 1), False),
+    ("get_storeman_by_mobile", lambda db: crud.get_storeman_by_mobile(db, "0000000000"), False),
+    ("get_store", lambda db: crud.get_store(db, 1, 1), False),
+    ("get_stores_by_owner", lambda db: crud.get_stores_by_owner(db, 1), False),
+    ("get_products", lambda db: crud.get_products(db), True),
+    ("get_customer", lambda db: crud.get_customer(db, 1), False),
+    ("get_customers_by_store", lambda db: crud.get_customers_by_store(db, 1, 50), False),
+    ("search_customers:name", lambda db: crud.search_customers(db, 1, "Ann"), False),
+    ("search_customers:phone", lambda db: crud.search_customers(db, 1, "98765"), False),
+    ("get_order", lambda db: crud.get_order(db, 1), False),
+    ("get_orders_by_customer", lambda db: crud.get_orders_by_customer(db, 1, 50), False),
+    ("get_orders_by_store", lambda db: crud.get_orders_by_store(db, 1, 50), False),
+    ("get_orders_by_store:summary", lambda db: crud.get_orders_by_store(db, 1, 50, view="summary"), False),
+    ("order_rows.store_orders_page", lambda db: order_rows.store_orders_page(db, 1, 50), False),
+    ("get_inquiries_by_store", lambda db: crud.get_inquiries_by_store(db, 1, 50), False),
+    ("get_inquiries_by_customer", lambda db: crud.get_inquiries_by_customer(db, 1), False),
+    ("get_offers_by_store", lambda db: crud.get_offers_by_store(db, 1, 50), False),
+    ("get_all_offers", lambda db: crud.get_all_offers(db, 50), True),
+]
+
+
+@contextmanager
+def capture_selects(engine):
+    """Collect (statement, parameters) for every SELECT sent to engine inside the block."""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(conn, statement, parameters):
+    """Return the plan rows of a captured statement as dicts."""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    result = conn.exec_driver_sql(prefix + statement, parameters)
+    return [dict(row) for row in result.mappings()]
+
+
+def full_scans(dialect_name: str, plan):
+    """Return the names of tables the plan reads in full."""
+    scanned = []
+    for row in plan:
+        if dialect_name == "sqlite":
+            # e.g. "SCAN orders", "SCAN orders USING INDEX ix_...", "SEARCH orders USING ..."
+            detail = row.get("detail", "")
+            parts = detail.split()
+            if len(parts) >= 2 and parts[0] == "SCAN" and "USING" not in parts:
+                if not parts[1].startswith(("anon_", "(")) and parts[1] != "CONSTANT":
+                    scanned.append(parts[1])
+        else:
+            table = row.get("table") or ""
+            if row.get("type") == "ALL" and not table.startswith("<"):
+                scanned.append(table)
+    return scanned
+
+
+def check_crud_plans(db):
+    """Run every CRUD_READS entry and return a list of (name, statement, tables) offenders."""
+    engine = db.get_bind()
+    offenders = []
+    for name, call, scan_allowed in CRUD_READS:
+        with capture_selects(engine) as captured:
+            call(db)
+        db.rollback()
+        if scan_allowed:
+            continue
+        with engine.connect() as conn:
+            for statement, parameters in captured:
+                tables = full_scans(conn.dialect.name, explain(conn, statement, parameters))
+                if tables:
+                    offenders.append((name, statement, tables))
+    return offenders
+
+
+def assert_no_full_scans(db):
+    """Raise AssertionError listing every crud read that falls back to a full table scan."""
+    offenders = check_crud_plans(db)
+    if offenders:
+        lines = [f"{name}: full scan of {', '.join(tables)}\n    {' '.join(statement.split())}"
+                 for name, statement, tables in offenders]
+        raise AssertionError("Queries without a usable index:\n" + "\n".join(lines))
+
+
+if __name__ == "__main__":
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        assert_no_full_scans(session)
+    except AssertionError as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        session.close()
+    print(f"OK: {len(CRUD_READS)} crud reads use indexes")
@@ -0,0 +1,185 @@
+"""
+Read-replica routing with read-your-writes carried by the client.
+
+ReplicaRouter picks the engine for read-only sessions. Stickiness cannot live in a worker's
+memory: the read after a write may be served by another worker or host. Instead, when a
+request commits a write, ReadYourWritesMiddleware returns the commit time (epoch seconds) in
+a LAST_WRITE_COOKIE cookie and an X-Last-Write header; the client sends either back, and a
+read carrying a stamp younger than READ_YOUR_WRITES_SECONDS goes to the primary. Stamps are
+wall-clock time, so workers need synchronized clocks (NTP) to agree on them.
+"""
+import itertools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "x-last-write"
+
+
+def replica_lag_seconds(conn):
+    """
+    Return how many seconds a replica is behind its primary, or None when that is unknown:
+    replication broken or not configured, or a database this cannot measure (e.g. SQLite).
+    None keeps the replica out of rotation.
+    """
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        row = conn.execute(text(
+            "SELECT pg_is_in_recovery(), "
+            "COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+        )).first()
+        return float(row[1]) if row and row[0] else None
+    if dialect not in ("mysql", "mariadb"):
+        return None
+    for stmt in ("SHOW REPLICA STATUS", "SHOW SLAVE STATUS"):  # MySQL < 8.0.22 / MariaDB < 10.5
+        try:
+            row = conn.execute(text(stmt)).mappings().first()
+        except Exception:
+            continue
+        if row is None:
+            return None  # not configured as a replica
+        # MySQL 8.0.22+ names it Seconds_Behind_Source; MariaDB and older MySQL, ..._Master
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return None if lag is None else float(lag)
+    return None
+
+
+# ---------------- Read-your-writes ----------------
+_last_write: ContextVar[Optional[list]] = ContextVar("last_write", default=None)
+
+
+def record_write():
+    """Note that the current request committed a write (called from the session after_commit hook)."""
+    holder = _last_write.get()
+    if holder is not None:
+        holder[0] = time.time()
+
+
+def last_write_from(request) -> Optional[float]:
+    """The write stamp the client sent back, from the header or the cookie; None if absent or bad."""
+    if request is None:
+        return None
+    raw = request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE)
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+class ReadYourWritesMiddleware:
+    """
+    Plain ASGI middleware: when the request committed a write, stamp the response with its
+    time as the last_write cookie and X-Last-Write header. Sync endpoints run with a copy of
+    this context, so they reach the same holder list.
+    """
+
+    def __init__(self, app, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.sticky_seconds <= 0:
+            return await self.app(scope, receive, send)
+
+        holder = [None]
+        token = _last_write.set(holder)
+
+        async def send_with_stamp(message):
+            if message["type"] == "http.response.start" and holder[0] is not None:
+                stamp = f"{holder[0]:.3f}"
+                cookie = (f"{LAST_WRITE_COOKIE}={stamp}; Max-Age={int(self.sticky_seconds) + 1}; "
+                          "Path=/; HttpOnly; SameSite=Lax")
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"set-cookie", cookie.encode()),
+                    (LAST_WRITE_HEADER.encode(), stamp.encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stamp)
+        finally:
+            _last_write.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine for read-only sessions.
+
+    Replicas are served round-robin while healthy. A replica is taken out of rotation when it
+    cannot answer SELECT 1 or lags more than max_lag seconds, and re-checked every check_interval.
+    Reads whose client wrote within sticky_seconds (see last_write_from) go to the primary, so
+    clients read their own writes whichever worker served the write.
+    """
+
+    def __init__(self, primary, replicas, max_lag: float, check_interval: float, sticky_seconds: float):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+
+        self._healthy = list(self.replicas)
+        self._cycle = itertools.cycle(self._healthy) if self._healthy else None
+        self._status = {}
+        self._last_check = 0.0
+        self._check_lock = threading.Lock()
+
+    # ---------------- Engine selection ----------------
+    def is_sticky(self, last_write: Optional[float]) -> bool:
+        # a stamp slightly in the future is another host's clock running ahead
+        return last_write is not None and -self.sticky_seconds < time.time() - last_write < self.sticky_seconds
+
+    def pick(self, last_write: Optional[float] = None):
+        """Return the engine for a read-only session of a client whose last write was at last_write."""
+        if not self.replicas or self.is_sticky(last_write):
+            return self.primary
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.check()
+        cycle = self._cycle
+        if cycle is None:
+            return self.primary
+        return next(cycle)
+
+    def check(self):
+        """Probe every replica and rebuild the rotation. Only one caller probes at a time."""
+        if not self._check_lock.acquire(blocking=False):
+            return self._status
+        try:
+            healthy, status = [], {}
+            for replica in self.replicas:
+                name = replica.url.render_as_string(hide_password=True)
+                try:
+                    with replica.connect() as conn:
+                        conn.execute(text("SELECT 1"))
+                        lag = replica_lag_seconds(conn)
+                except Exception as e:
+                    status[name] = {"healthy": False, "lag_seconds": None, "error": str(e)}
+                    continue
+                ok = lag is not None and lag <= self.max_lag
+                status[name] = {"healthy": ok, "lag_seconds": lag}
+                if ok:
+                    healthy.append(replica)
+                else:
+                    logger.warning("Replica %s out of rotation (lag=%s)", name, lag)
+
+            self._healthy = healthy
+            self._cycle = itertools.cycle(healthy) if healthy else None
+            self._status = status
+            self._last_check = time.monotonic()
+            return status
+        finally:
+            self._check_lock.release()
+
+    def status(self) -> dict:
+        return {
+            "replicas": len(self.replicas),
+            "healthy": len(self._healthy),
+            "details": self._status,
+        }
@@ -0,0 +1,48 @@
+"""
+Version counters for read-mostly resources, used as cheap HTTP validators.
+
+Each (scope, resource_id) row in resource_versions is incremented by the crud write paths in the
+same transaction as the change, so a GET can compare one primary-key lookup against the
+client's ETag instead of running and serializing its list query (see http_cache.conditional_get).
+A missing row is version 0.
+"""
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+OFFERS = "offers"   # offers of one store (resource_id = store_id), or of all stores (ALL)
+STORES = "stores"   # the stores of one owner (resource_id = owner_id)
+STORE = "store"     # a single store (resource_id = store_id)
+PRODUCTS = "products"   # the product catalog (resource_id = ALL)
+
+ALL = 0
+
+
+def bump(db: Session, scope: str, *resource_ids):
+    """Increment the version of each resource. Does not commit."""
+    table = models.ResourceVersion.__table__
+    dialect = db.get_bind().dialect.name
+    for resource_id in resource_ids:
+        values = {"scope": scope, "resource_id": resource_id, "version": 1}
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql_insert(table).values(values)
+            stmt = stmt.on_duplicate_key_update(version=table.c.version + 1)
+        else:
+            insert_ = pg_insert if dialect == "postgresql" else sqlite_insert
+            stmt = insert_(table).values(values).on_conflict_do_update(
+                index_elements=["scope", "resource_id"],
+                set_={"version": table.c.version + 1},
+            )
+        db.execute(stmt)
+
+
+def get_version(db: Session, scope: str, resource_id: int) -> int:
+    Version = models.ResourceVersion
+    version = db.execute(
+        select(Version.version).where(Version.scope == scope, Version.resource_id == resource_id)
+    ).scalar_one_or_none()
+    return version or 0
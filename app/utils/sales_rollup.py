@@ -0,0 +1,234 @@
+"""
+Daily sales rollups: per store (store_daily_sales) and per store and product
+(store_product_daily_sales).
+
+create_order and order status changes add or subtract one order's contribution, and
+crud.delete_customer subtracts those of the orders it cascades to, in the same transaction
+as the write, so the tables are always current and the sales and
+top-product endpoints read at most one row per store (and product) per day instead of
+scanning orders. Cancelled orders are not counted. The day is the DATE() of
+orders.created_at as stored by the database.
+
+Rebuild from scratch (e.g. after a bulk load or to verify the counters):
+    python -m app.utils.sales_rollup [--store-id N]
+"""
+import argparse
+import heapq
+from datetime import date, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app import models
+
+EXCLUDED_STATUSES = ("Cancelled",)
+BUCKETS = ("day", "week", "month")
+RANKINGS = ("quantity", "revenue")
+
+_COUNTERS = ("orders", "revenue", "items")
+_PRODUCT_COUNTERS = ("quantity", "revenue")
+
+
+def is_counted(status: str) -> bool:
+    return status not in EXCLUDED_STATUSES
+
+
+def _items_per_order():
+    OrderItem = models.OrderItem
+    return (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity).label("quantity"))
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+
+
+def _upsert_from_select(db: Session, model, keys, counters, query):
+    """INSERT INTO model ... SELECT ..., adding to the counters of rows that already exist."""
+    table = model.__table__
+    columns = [*keys, *counters]
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table).from_select(columns, query)
+        stmt = stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in counters})
+    else:
+        insert_ = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_(table).from_select(columns, query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={c: table.c[c] + stmt.excluded[c] for c in counters},
+        )
+    db.execute(stmt)
+
+
+def counted():
+    """WHERE clause for orders the rollups count."""
+    return func.coalesce(models.Order.status, "").notin_(EXCLUDED_STATUSES)
+
+
+def apply_orders(db: Session, *where, sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) the contribution of every order matching where, with one
+    upsert per rollup table however many orders match. Does not commit.
+    """
+    Order, OrderItem = models.Order, models.OrderItem
+    items = (
+        select(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .where(OrderItem.order_id == Order.id)
+        .scalar_subquery()
+    )
+    day = func.date(Order.created_at)
+    _upsert_from_select(db, models.StoreDailySales, ("store_id", "day"), _COUNTERS, select(
+        Order.store_id,
+        day,
+        func.count() * sign,
+        func.sum(Order.total) * sign,
+        func.sum(items) * sign,
+    ).where(*where).group_by(Order.store_id, day))
+    _upsert_from_select(
+        db, models.StoreProductDailySales, ("store_id", "day", "product_id"), _PRODUCT_COUNTERS,
+        select(
+            Order.store_id,
+            day,
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity) * sign,
+            func.sum(OrderItem.quantity * OrderItem.price) * sign,
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(*where)
+        .group_by(Order.store_id, day, OrderItem.product_id),
+    )
+
+
+def apply_order(db: Session, order_id: int, sign: int = 1):
+    """Add (sign=1) or remove (sign=-1) one order's contribution. Does not commit."""
+    apply_orders(db, models.Order.id == order_id, sign=sign)
+
+
+def apply_status_change(db: Session, order_id: int, old_status: str, new_status: str):
+    if is_counted(old_status) != is_counted(new_status):
+        apply_order(db, order_id, 1 if is_counted(new_status) else -1)
+
+
+def backfill(db: Session, store_id: int = None) -> int:
+    """Rebuild the rollups (for one store, or all) with one GROUP BY each over orders. Commits."""
+    Order, OrderItem = models.Order, models.OrderItem
+    Sales, ProductSales = models.StoreDailySales, models.StoreProductDailySales
+    items = _items_per_order()
+    day = func.date(Order.created_at)
+    query = (
+        select(
+            Order.store_id,
+            day,
+            func.count(),
+            func.coalesce(func.sum(Order.total), 0),
+            func.coalesce(func.sum(items.c.quantity), 0),
+        )
+        .outerjoin(items, items.c.order_id == Order.id)
+        .where(counted())
+        .group_by(Order.store_id, day)
+    )
+    product_query = (
+        select(
+            Order.store_id,
+            day,
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.quantity * OrderItem.price),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .where(counted())
+        .group_by(Order.store_id, day, OrderItem.product_id)
+    )
+    clear, clear_products = delete(Sales), delete(ProductSales)
+    if store_id is not None:
+        query = query.where(Order.store_id == store_id)
+        product_query = product_query.where(Order.store_id == store_id)
+        clear = clear.where(Sales.store_id == store_id)
+        clear_products = clear_products.where(ProductSales.store_id == store_id)
+    db.execute(clear)
+    db.execute(clear_products)
+    db.execute(insert(Sales).from_select(["store_id", "day", *_COUNTERS], query))
+    db.execute(insert(ProductSales).from_select(["store_id", "day", "product_id", *_PRODUCT_COUNTERS], product_query))
+    db.commit()
+    count = select(func.count()).select_from(Sales)
+    if store_id is not None:
+        count = count.where(Sales.store_id == store_id)
+    return db.execute(count).scalar_one()
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())   # ISO weeks start on Monday
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def sales_series(db: Session, store_id: int, date_from: date, date_to: date, bucket: str = "day"):
+    """Sales per bucket between date_from and date_to (inclusive), oldest first."""
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKETS)}")
+    Sales = models.StoreDailySales
+    rows = db.execute(
+        select(Sales.day, Sales.orders, Sales.revenue, Sales.items)
+        .where(Sales.store_id == store_id, Sales.day >= date_from, Sales.day <= date_to)
+        .order_by(Sales.day)
+    ).all()
+    points = {}
+    for day, orders, revenue, items in rows:
+        point = points.setdefault(_bucket_start(day, bucket), {"orders": 0, "revenue": 0.0, "items": 0})
+        point["orders"] += orders
+        point["revenue"] += revenue
+        point["items"] += items
+    return [
+        {"period_start": start, "orders": p["orders"], "revenue": round(p["revenue"], 2), "items": p["items"]}
+        for start, p in points.items()
+        if p["orders"]
+    ]
+
+
+def top_products(db: Session, store_id: int, date_from: date, date_to: date, by: str = "quantity", limit: int = 10):
+    """
+    The limit best-selling products of a store between date_from and date_to (inclusive).
+    Daily buckets are summed per product, then a bounded heap keeps the top `limit`.
+    """
+    if by not in RANKINGS:
+        raise ValueError(f"by must be one of {', '.join(RANKINGS)}")
+    ProductSales = models.StoreProductDailySales
+    rows = db.execute(
+        select(ProductSales.product_id, ProductSales.quantity, ProductSales.revenue)
+        .where(ProductSales.store_id == store_id, ProductSales.day >= date_from, ProductSales.day <= date_to)
+    )
+    totals = {}
+    for product_id, quantity, revenue in rows:
+        total = totals.setdefault(product_id, [0, 0.0])
+        total[0] += quantity
+        total[1] += revenue
+    rank = 0 if by == "quantity" else 1
+    best = heapq.nlargest(
+        limit,
+        ((t[rank], -product_id, product_id, t) for product_id, t in totals.items() if t[0] > 0),
+    )
+    names = dict(db.execute(
+        select(models.Product.id, models.Product.name).where(models.Product.id.in_([b[2] for b in best]))
+    ).all()) if best else {}
+    return [
+        {"product_id": product_id, "name": names.get(product_id), "quantity": t[0], "revenue": round(t[1], 2)}
+        for _, _, product_id, t in best
+    ]
+
+
+if __name__ == "__main__":
+    from app.database import Base, SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Rebuild the daily sales rollups from orders")
+    parser.add_argument("--store-id", type=int)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as session:
+        rows = backfill(session, args.store_id)
+    print(f"OK: sales rollups rebuilt, {rows} store days")
@@ -0,0 +1,137 @@
+"""
+RFM (recency, frequency, monetary) segmentation of a store's customers.
+
+Orders are read as (customer_id, created_at, total) in keyset-paged chunks (WHERE id > last
+ORDER BY id LIMIT n), so no cursor is open while progress is reported, and reduced per chunk to
+per-customer partial aggregates with pandas, so memory grows with customers, not orders.
+Scores are 1-5 quintiles of the store's customers, computed on whole columns at once;
+segments follow from the scores with np.select. The result replaces the store's rows in
+customer_segments, which offers can target (OfferCreate.segment).
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.sales_rollup import EXCLUDED_STATUSES
+
+# checked in order; the first matching rule wins
+SEGMENTS = ("champions", "loyal", "new", "at_risk", "lapsing", "regular")
+
+CHUNK_SIZE = 100_000
+INSERT_BATCH = 5_000
+
+
+def iter_order_chunks(db: Session, store_id: int, chunk_size: int = CHUNK_SIZE):
+    """Yield DataFrames of (customer_id, created_at, total) for the store's counted orders."""
+    Order = models.Order
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Order.id, Order.customer_id, Order.created_at, Order.total)
+            .where(
+                Order.store_id == store_id,
+                Order.id > last_id,
+                func.coalesce(Order.status, "").notin_(EXCLUDED_STATUSES),
+            )
+            .order_by(Order.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield pd.DataFrame([row[1:] for row in rows], columns=["customer_id", "created_at", "total"])
+
+
+def aggregate(chunks) -> pd.DataFrame:
+    """Reduce order chunks to one row per customer: last_order, frequency, monetary."""
+    partials = []
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        chunk = chunk.assign(created_at=pd.to_datetime(chunk["created_at"], utc=True).dt.tz_localize(None))
+        partials.append(
+            chunk.groupby("customer_id", sort=False).agg(
+                last_order=("created_at", "max"),
+                frequency=("created_at", "size"),
+                monetary=("total", "sum"),
+            )
+        )
+    if not partials:
+        return pd.DataFrame(columns=["last_order", "frequency", "monetary"])
+    combined = pd.concat(partials)
+    if len(partials) == 1:
+        return combined
+    return combined.groupby(level=0, sort=False).agg(
+        last_order=("last_order", "max"),
+        frequency=("frequency", "sum"),
+        monetary=("monetary", "sum"),
+    )
+
+
+def _quintile(values: pd.Series) -> np.ndarray:
+    """1..5 by rank percentile; ties keep their order of appearance, so every bucket is used."""
+    pct = values.rank(method="first", pct=True).to_numpy()
+    return np.clip(np.ceil(pct * 5), 1, 5).astype(np.int8)
+
+
+def score(agg: pd.DataFrame, now: datetime = None) -> pd.DataFrame:
+    """Add recency_days, r/f/m scores and segment columns to aggregate() output."""
+    now = pd.Timestamp(now or datetime.utcnow())
+    out = agg.copy()
+    if out.empty:
+        return out.assign(recency_days=[], r_score=[], f_score=[], m_score=[], segment=[])
+    out["recency_days"] = (now - out["last_order"]).dt.days.clip(lower=0).astype(np.int64)
+    out["r_score"] = _quintile(-out["recency_days"])   # recent buyers score high
+    out["f_score"] = _quintile(out["frequency"])
+    out["m_score"] = _quintile(out["monetary"])
+
+    r, f, m = out["r_score"].to_numpy(), out["f_score"].to_numpy(), out["m_score"].to_numpy()
+    out["segment"] = np.select(
+        [
+            (r >= 4) & (f >= 4) & (m >= 4),
+            (r >= 3) & (f >= 4),
+            (r >= 4) & (out["frequency"].to_numpy() == 1),
+            (r <= 2) & ((f >= 3) | (m >= 3)),
+            r <= 2,
+        ],
+        list(SEGMENTS[:-1]),
+        default=SEGMENTS[-1],
+    )
+    return out
+
+
+def store_segments(db: Session, store_id: int, scored: pd.DataFrame, computed_at: datetime = None):
+    """Replace the store's customer_segments rows with scored. Commits."""
+    Segment = models.CustomerSegment
+    computed_at = computed_at or datetime.utcnow()
+    db.execute(delete(Segment).where(Segment.store_id == store_id))
+    frame = scored.reset_index().rename(columns={"index": "customer_id"})
+    columns = ["customer_id", "recency_days", "frequency", "monetary", "r_score", "f_score", "m_score", "segment"]
+    frame = frame[columns].assign(store_id=store_id, computed_at=computed_at)
+    for start in range(0, len(frame), INSERT_BATCH):
+        # to_dict boxes numpy scalars into plain Python values the DB driver accepts
+        db.execute(insert(Segment), frame.iloc[start:start + INSERT_BATCH].to_dict("records"))
+    db.commit()
+
+
+def segment_store(db: Session, store_id: int, chunk_size: int = CHUNK_SIZE, report=None) -> dict:
+    def chunks():
+        seen = 0
+        for chunk in iter_order_chunks(db, store_id, chunk_size):
+            seen += len(chunk)
+            if report:
+                report(seen)
+            yield chunk
+
+    scored = score(aggregate(chunks()))
+    store_segments(db, store_id, scored)
+    counts = scored["segment"].value_counts()
+    return {
+        "store_id": store_id,
+        "customers": int(len(scored)),
+        "segments": {name: int(counts.get(name, 0)) for name in SEGMENTS},
+    }
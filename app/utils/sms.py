@@ -0,0 +1,125 @@
+"""
+Pluggable SMS delivery.
+
+A provider sends a batch of messages and reports, per message, None on success or an error
+string. Pick one with SMS_PROVIDER; "log" (default) appends to a local file for development.
+A message's secret (e.g. a login OTP) is never written to that file.
+"""
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# secret: a credential inside body (e.g. an OTP) that providers must not persist
+Message = namedtuple("Message", ["to", "body", "customer_id", "secret"], defaults=(None,))
+
+
+class SMSProvider(ABC):
+    name = "base"
+    max_batch_size = 100
+
+    @abstractmethod
+    def send_batch(self, messages):
+        """Send messages; return a list with None (delivered) or an error string per message."""
+
+
+class LogFileProvider(SMSProvider):
+    """
+    Writes every message as one line to a local file instead of delivering it. Secrets are
+    masked in the file and printed to stdout only, so they do not outlive the process.
+    """
+
+    name = "log"
+    max_batch_size = 1000
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.SMS_LOG_PATH
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+
+    def send_batch(self, messages):
+        stamp = datetime.utcnow().isoformat(timespec="seconds")
+        lines = "".join(f"{stamp}\t{m.to}\t{_masked(m)}\n" for m in messages)
+        for m in messages:
+            if m.secret:
+                print(f"SMS to {m.to}: {m.body}")   # development only, like the old OTP print
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(lines)
+        return [None] * len(messages)
+
+
+def _masked(message: Message) -> str:
+    if not message.secret:
+        return message.body
+    return message.body.replace(message.secret, "*" * len(message.secret))
+
+
+PROVIDERS = {
+    LogFileProvider.name: LogFileProvider,
+}
+
+
+def get_provider(name: str = None) -> SMSProvider:
+    name = name or settings.SMS_PROVIDER
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown SMS provider: {name}")
+    return PROVIDERS[name]()
+
+
+class RateLimiter:
+    """Token bucket: acquire(n) blocks until n sends fit within rate_per_second."""
+
+    def __init__(self, rate_per_second: float, burst: float = None):
+        self.rate = rate_per_second
+        self.capacity = burst or max(rate_per_second, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: int = 1):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                # a request larger than the bucket is let through once the bucket is full
+                if self.tokens >= min(n, self.capacity):
+                    self.tokens -= n
+                    return
+                wait = (min(n, self.capacity) - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def send_with_retries(provider: SMSProvider, messages, limiter: RateLimiter, max_retries: int):
+    """
+    Send messages in provider-sized batches, retrying failed ones with exponential backoff.
+    Returns (delivered, failed) counts.
+    """
+    delivered = failed = 0
+    for start in range(0, len(messages), provider.max_batch_size):
+        pending = messages[start:start + provider.max_batch_size]
+        for attempt in range(max_retries + 1):
+            limiter.acquire(len(pending))
+            try:
+                errors = provider.send_batch(pending)
+            except Exception as e:
+                logger.warning("SMS batch of %d failed (attempt %d): %s", len(pending), attempt + 1, e)
+                errors = [str(e)] * len(pending)
+            retry = [m for m, err in zip(pending, errors) if err is not None]
+            delivered += len(pending) - len(retry)
+            pending = retry
+            if not pending:
+                break
+            if attempt < max_retries:
+                time.sleep(min(0.5 * 2 ** attempt, 30))
+        failed += len(pending)
+    return delivered, failed
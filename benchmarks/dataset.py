@@ -0,0 +1,193 @@
+"""
+Synthetic dataset generator for benchmarks and load tests.
+
+    python -m benchmarks.dataset --owners 100 --stores-per-owner 3 --customers-per-store 2000 \\
+        --products 500 --orders 1000000 --items-per-order 4 [--url sqlite:///./bench.db]
+
+Bulk-loads owners, stores, customers, products, orders and order items with Core
+executemany inserts of --batch rows, generated lazily, so memory stays flat up to tens of
+millions of rows. Ids are assigned here, continuing after the highest existing id, so the
+tables may already hold data. Derived data that the write paths normally maintain (customer
+search columns, order totals, the daily sales rollups) is produced as well. The target is
+--url, or DATABASE_URL; tables are created if missing. Generation is deterministic per --seed.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+from sqlalchemy import create_engine, func, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.utils import sales_rollup  # noqa: E402
+from app.utils.phone import normalize_phone, reverse_phone  # noqa: E402
+
+FIRST_NAMES = ("Aarav", "Anil", "Bharat", "Chitra", "Deepak", "Esha", "Farah", "Gita", "Harsh", "Isha",
+               "Jay", "Kavya", "Lakshmi", "Manoj", "Neha", "Omkar", "Priya", "Rahul", "Sneha", "Tara")
+LAST_NAMES = ("Patil", "Sharma", "Iyer", "Khan", "Das", "Mehta", "Nair", "Joshi", "Rao", "Gupta")
+CITIES = ("Pune", "Mumbai", "Nashik", "Nagpur", "Bengaluru", "Hyderabad")
+STATUSES = ("Pending", "Paid", "Paid", "Paid", "Delivered", "Cancelled")
+HISTORY_DAYS = 730
+
+
+def batched(rows, size: int):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def next_id(db: Session, model) -> int:
+    return (db.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def _phone(rng: random.Random) -> str:
+    return f"9{rng.randrange(10 ** 9):09d}"
+
+
+def owners(first: int, count: int, rng: random.Random):
+    for owner_id in range(first, first + count):
+        yield {"id": owner_id, "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+               "mobile": f"8{owner_id:09d}", "password_hash": "", "shop_name": f"Shop {owner_id}",
+               "address": rng.choice(CITIES)}
+
+
+def stores(first: int, owner_ids, per_owner: int, rng: random.Random):
+    store_id = first
+    for owner_id in owner_ids:
+        for _ in range(per_owner):
+            yield {"id": store_id, "name": f"Store {store_id}", "location": rng.choice(CITIES), "owner_id": owner_id}
+            store_id += 1
+
+
+def customers(first: int, store_ids, per_store: int, rng: random.Random):
+    customer_id = first
+    for store_id in store_ids:
+        for _ in range(per_store):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            phone = _phone(rng)
+            yield {"id": customer_id, "name": name, "phone": phone, "store_id": store_id,
+                   "email": f"c{customer_id}@example.com", "address": rng.choice(CITIES),
+                   "name_lower": name.lower(), "phone_normalized": normalize_phone(phone),
+                   "phone_reversed": reverse_phone(phone)}
+            customer_id += 1
+
+
+def products(first: int, count: int, rng: random.Random):
+    for product_id in range(first, first + count):
+        yield {"id": product_id, "name": f"Product {product_id}", "price": round(rng.uniform(5, 2000), 2)}
+
+
+def orders_and_items(first_order: int, first_item: int, count: int, items_per_order: int,
+                     customer_ranges, prices, rng: random.Random, now: datetime):
+    """
+    Yield (order, items) pairs. customer_ranges: (store_id, first_customer_id, last_customer_id);
+    each order goes to a random store and one of its customers. The order total is the sum of
+    its items, as create_order computes it.
+    """
+    product_ids = list(prices)
+    item_id = first_item
+    for order_id in range(first_order, first_order + count):
+        store_id, low, high = rng.choice(customer_ranges)
+        items = []
+        for product_id in rng.sample(product_ids, min(items_per_order, len(product_ids))):
+            items.append({"id": item_id, "order_id": order_id, "product_id": product_id,
+                          "quantity": rng.randint(1, 5), "price": prices[product_id]})
+            item_id += 1
+        order = {"id": order_id, "store_id": store_id, "customer_id": rng.randint(low, high),
+                 "total": round(sum(i["quantity"] * i["price"] for i in items), 2),
+                 "status": rng.choice(STATUSES),
+                 "created_at": now - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400))}
+        yield order, items
+
+
+def load(engine, n_owners: int, stores_per_owner: int, customers_per_store: int, n_products: int,
+         n_orders: int, items_per_order: int, batch: int = 10_000, seed: int = 7, report=print) -> dict:
+    """Generate and insert the dataset; returns row counts and timings."""
+    rng = random.Random(seed)
+    Base.metadata.create_all(bind=engine)
+    counts, timings = {}, {}
+
+    def insert_rows(db, model, rows):
+        started, total = time.perf_counter(), 0
+        for chunk in batched(rows, batch):
+            db.execute(insert(model), chunk)
+            db.commit()
+            total += len(chunk)
+        name = model.__tablename__
+        counts[name] = counts.get(name, 0) + total
+        timings[name] = round(timings.get(name, 0) + time.perf_counter() - started, 2)
+        report(f"  {name}: {counts[name]} rows in {timings[name]}s")
+
+    with Session(engine) as db:
+        first_owner = next_id(db, models.Owner)
+        insert_rows(db, models.Owner, owners(first_owner, n_owners, rng))
+        owner_ids = range(first_owner, first_owner + n_owners)
+
+        first_store = next_id(db, models.Store)
+        insert_rows(db, models.Store, stores(first_store, owner_ids, stores_per_owner, rng))
+        store_ids = range(first_store, first_store + n_owners * stores_per_owner)
+
+        first_customer = next_id(db, models.Customer)
+        insert_rows(db, models.Customer, customers(first_customer, store_ids, customers_per_store, rng))
+        customer_ranges = [
+            (store_id, first_customer + i * customers_per_store, first_customer + (i + 1) * customers_per_store - 1)
+            for i, store_id in enumerate(store_ids)
+        ] if customers_per_store else []
+
+        first_product = next_id(db, models.Product)
+        insert_rows(db, models.Product, products(first_product, n_products, rng))
+        prices = dict(db.execute(select(models.Product.id, models.Product.price)).all())
+
+        if n_orders and customer_ranges and prices:
+            pairs = orders_and_items(next_id(db, models.Order), next_id(db, models.OrderItem), n_orders,
+                                     items_per_order, customer_ranges, prices, rng, datetime.utcnow())
+            # orders and their items go in the same batches so each commit is consistent
+            started = time.perf_counter()
+            for chunk in batched(pairs, max(1, batch // max(1, items_per_order))):
+                db.execute(insert(models.Order), [order for order, _ in chunk])
+                db.execute(insert(models.OrderItem), [item for _, items in chunk for item in items])
+                db.commit()
+                counts["orders"] = counts.get("orders", 0) + len(chunk)
+                counts["order_items"] = counts.get("order_items", 0) + sum(len(items) for _, items in chunk)
+            timings["orders"] = round(time.perf_counter() - started, 2)
+            report(f"  orders: {counts['orders']} rows, order_items: {counts['order_items']} rows "
+                   f"in {timings['orders']}s")
+
+        started = time.perf_counter()
+        sales_rollup.backfill(db)
+        timings["sales_rollup"] = round(time.perf_counter() - started, 2)
+        report(f"  sales rollups rebuilt in {timings['sales_rollup']}s")
+    return {"rows": counts, "seconds": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.environ["DATABASE_URL"])
+    parser.add_argument("--owners", type=int, default=20)
+    parser.add_argument("--stores-per-owner", type=int, default=2)
+    parser.add_argument("--customers-per-store", type=int, default=500)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--items-per-order", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    print(f"Loading into {engine.url.render_as_string(hide_password=True)}")
+    started = time.perf_counter()
+    result = load(engine, args.owners, args.stores_per_owner, args.customers_per_store, args.products,
+                  args.orders, args.items_per_order, args.batch, args.seed)
+    total_rows = sum(result["rows"].values())
+    elapsed = time.perf_counter() - started
+    print(f"OK: {total_rows} rows in {elapsed:.1f}s ({total_rows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
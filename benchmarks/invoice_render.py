@@ -0,0 +1,79 @@
+"""
+Invoices per second against the number of worker processes.
+
+    python -m benchmarks.invoice_render --invoices 200 --items 8 --workers 1 2 4 8
+
+Renders synthetic invoice snapshots through invoice_batch.render_parallel + stream_zip,
+the same path POST /orders/invoices/batch uses, and prints one line per worker count.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.utils import invoice_batch  # noqa: E402
+
+
+def synthetic_snapshots(count: int, items: int):
+    store = SimpleNamespace(id=1, name="Benchmark Store", location="Pune")
+    for order_id in range(1, count + 1):
+        yield SimpleNamespace(
+            id=order_id,
+            status="Paid",
+            total=0.0,
+            created_at=datetime(2026, 1, 1, 10, 0, 0),
+            store=store,
+            customer=SimpleNamespace(id=order_id, name=f"Customer {order_id}", phone="9876543210",
+                                     email=f"c{order_id}@example.com", address="MG Road"),
+            items=[
+                SimpleNamespace(quantity=1 + i % 3, price=10.0 + i,
+                                product=SimpleNamespace(id=i, name=f"Product {i}"))
+                for i in range(items)
+            ],
+        )
+
+
+def run(invoices: int, items: int, workers: int) -> dict:
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # warm the pool so process start-up is not counted
+        list(pool.map(abs, range(workers)))
+        start = time.perf_counter()
+        size = 0
+        rendered = invoice_batch.render_parallel(synthetic_snapshots(invoices, items), pool, 2 * workers)
+        for chunk in invoice_batch.stream_zip(rendered):
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "invoices": invoices,
+        "seconds": round(elapsed, 3),
+        "invoices_per_second": round(invoices / elapsed, 1),
+        "zip_bytes": size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--invoices", type=int, default=200)
+    parser.add_argument("--items", type=int, default=8)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for workers in sorted(set(args.workers)):
+        result = run(args.invoices, args.items, workers)
+        results.append(result)
+        print(f"{workers:>3} workers: {result['invoices_per_second']:>8} invoices/s ({result['seconds']}s)")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
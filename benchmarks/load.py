@@ -0,0 +1,214 @@
+"""
+Scripted load driver: latency percentiles and throughput per endpoint.
+
+    python -m benchmarks.load --requests 200 --concurrency 8 --out results.json
+    python -m benchmarks.load --baseline baseline.json --tolerance 0.2     # exit 1 on regression
+    python -m benchmarks.load --url http://127.0.0.1:8000                  # a running uvicorn
+
+By default the app runs in-process behind httpx's ASGITransport against DATABASE_URL (load
+it first with benchmarks.dataset); with --url requests go over HTTP to a running server whose
+database is the same DATABASE_URL. Ids for path parameters are sampled from that database and
+an owner token is minted for the sampled store, so owner-only routes are exercised too.
+
+Each SCENARIOS entry is run for --requests requests with --concurrency in flight, after
+--warmup unmeasured ones. The JSON written to --out holds, per scenario, p50/p95/p99/max in ms,
+requests per second and the error count. --baseline compares p95 and throughput against an
+earlier --out file and fails when either is worse by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench.db")
+
+import httpx  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app import auth, models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+TODAY = date.today()
+MONTH_AGO = TODAY - timedelta(days=30)
+
+# (name, method, path template, owner token, JSON body template); {placeholders} come from sample_ids()
+SCENARIOS = [
+    ("owners.list", "GET", "/owners/?limit=50", False, None),
+    ("stores.by_owner", "GET", "/stores/?owner_id={owner_id}", False, None),
+    ("stores.me", "GET", "/stores/me?store_id={store_id}", False, None),
+    ("stores.sales", "GET", f"/stores/{{store_id}}/sales?from={MONTH_AGO}&to={TODAY}", True, None),
+    ("stores.top_products", "GET", f"/stores/{{store_id}}/top-products?from={MONTH_AGO}&to={TODAY}", True, None),
+    ("products.catalog", "GET", "/products/", False, None),
+    ("customers.by_store", "GET", "/customers/by-store/{store_id}?limit=50", True, None),
+    ("customers.search", "GET", "/customers/search?store_id={store_id}&q={name_prefix}", True, None),
+    ("orders.get", "GET", "/orders/{order_id}", False, None),
+    ("orders.by_customer", "GET", "/orders/by-customer/{customer_id}?limit=50", False, None),
+    ("orders.by_store.detail", "GET", "/orders/by-store/{store_id}?limit=50", False, None),
+    ("orders.by_store.summary", "GET", "/orders/by-store/{store_id}?limit=50&view=summary", False, None),
+    ("inquiries.by_store", "GET", "/inquiries/by-store/{store_id}?limit=50", True, None),
+    ("offers.list", "GET", "/offers/?limit=50", False, None),
+    ("offers.by_store", "GET", "/offers/by-store/{store_id}?limit=50", False, None),
+    ("orders.create", "POST", "/orders/", False,
+     {"store_id": "{store_id}", "customer_id": "{customer_id}",
+      "items": [{"product_id": "{product_id}", "quantity": 2}]}),
+]
+
+
+def sample_ids(rng: random.Random) -> dict:
+    """Pick a store that has orders, and ids related to it, from the loaded database."""
+    Order = models.Order
+    with SessionLocal() as db:
+        total = db.execute(select(func.count()).select_from(Order)).scalar()
+        if not total:
+            raise SystemExit("No orders in the database; load one with python -m benchmarks.dataset")
+        order = db.execute(select(Order).offset(rng.randrange(min(total, 10_000))).limit(1)).scalar_one()
+        store = db.get(models.Store, order.store_id)
+        customer = db.get(models.Customer, order.customer_id)
+        product_id = db.execute(select(models.Product.id).limit(1)).scalar_one()
+        return {
+            "owner_id": store.owner_id,
+            "store_id": store.id,
+            "customer_id": customer.id,
+            "order_id": order.id,
+            "product_id": product_id,
+            "name_prefix": customer.name[:3],
+        }
+
+
+def _fill(template, ids: dict):
+    if isinstance(template, str):
+        value = template.format(**ids)
+        return int(value) if template.startswith("{") and value.isdigit() else value
+    if isinstance(template, list):
+        return [_fill(v, ids) for v in template]
+    if isinstance(template, dict):
+        return {k: _fill(v, ids) for k, v in template.items()}
+    return template
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(pct / 100 * len(sorted_values) + 0.5 - 1e-9))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, method: str, url: str, headers, body,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await client.request(method, url, headers=headers, json=body)
+
+    latencies, errors = [], 0
+    remaining = requests
+
+    async def worker():
+        nonlocal errors, remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            response = await client.request(method, url, headers=headers, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    ms = [v * 1000 for v in latencies]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(ms[-1], 2) if ms else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+
+async def run(base_url: str, requests: int, concurrency: int, warmup: int, only, seed: int) -> dict:
+    ids = sample_ids(random.Random(seed))
+    headers = {"Authorization": "Bearer " + auth.create_access_token({"sub": str(ids["owner_id"]), "role": "owner"})}
+    if base_url:
+        client = httpx.AsyncClient(base_url=base_url, timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = {}
+    async with client:
+        for name, method, path, needs_auth, body in SCENARIOS:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            results[name] = await run_scenario(
+                client, method, _fill(path, ids), headers if needs_auth else None, _fill(body, ids),
+                requests, concurrency, warmup,
+            )
+            r = results[name]
+            print(f"{name:26} p50 {r['p50_ms']:8.2f}  p95 {r['p95_ms']:8.2f}  p99 {r['p99_ms']:8.2f} ms  "
+                  f"{r['throughput_rps']:8.1f} req/s  errors {r['errors']}")
+    return {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "target": base_url or "in-process (ASGITransport)",
+            "requests": requests,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+            "ids": ids,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float):
+    """Return (scenario, message) for every p95 or throughput regression beyond tolerance."""
+    regressions = []
+    for name, now in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        if before["p95_ms"] and now["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append((name, f"p95 {before['p95_ms']} -> {now['p95_ms']} ms"))
+        if before["throughput_rps"] and now["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append((name, f"throughput {before['throughput_rps']} -> {now['throughput_rps']} req/s"))
+        if now["errors"] > before["errors"]:
+            regressions.append((name, f"errors {before['errors']} -> {now['errors']}"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server (default: in-process)")
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--only", nargs="*", help="scenario name prefixes, e.g. orders stores.sales")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.requests, args.concurrency, args.warmup, args.only, args.seed))
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(result, fh, indent=2)
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(result, json.load(fh), args.tolerance)
+        for name, message in regressions:
+            print(f"REGRESSION {name}: {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"OK: no regression beyond {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
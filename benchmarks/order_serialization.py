@@ -0,0 +1,103 @@
+"""
+Order list serialization: ORM + response_model path against the Core-row fast path.
+
+    python -m benchmarks.order_serialization --orders 10000 --items 5 --repeat 3
+
+Loads a synthetic store into an in-memory SQLite database, then times turning every order
+of the store into JSON both ways and prints the best of --repeat runs, split into query and
+serialization time:
+
+* orm  - crud.get_orders_by_store, Page[OrderOut] validated from attributes, jsonable_encoder,
+         json.dumps (what the endpoint used to do)
+* fast - order_rows.fetch_orders, one TypeAdapter call, orjson (GET /orders/by-store/{id})
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.utils import order_rows  # noqa: E402
+from app.utils.pagination import build_page  # noqa: E402
+
+STORE_ID = 1
+PRODUCTS = 200
+
+
+def load(db: Session, orders: int, items: int):
+    db.execute(insert(models.Owner), [{"id": 1, "name": "Owner", "mobile": "9000000000",
+                                       "password_hash": "", "shop_name": "Bench"}])
+    db.execute(insert(models.Store), [{"id": STORE_ID, "name": "Bench", "owner_id": 1}])
+    db.execute(insert(models.Customer), [{"id": 1, "name": "Customer", "phone": "9000000001", "store_id": STORE_ID}])
+    db.execute(insert(models.Product), [{"id": i, "name": f"Product {i}", "price": 10.0 + i}
+                                        for i in range(1, PRODUCTS + 1)])
+    start = datetime(2026, 1, 1)
+    db.execute(insert(models.Order), [
+        {"id": o, "store_id": STORE_ID, "customer_id": 1, "total": 100.0 + o % 50, "status": "Pending",
+         "created_at": start + timedelta(minutes=o)}
+        for o in range(1, orders + 1)
+    ])
+    db.execute(insert(models.OrderItem), [
+        {"order_id": o, "product_id": 1 + (o * items + i) % PRODUCTS, "quantity": 1 + i, "price": 10.0 + i}
+        for o in range(1, orders + 1) for i in range(items)
+    ])
+    db.commit()
+
+
+def orm_path(db: Session, limit: int):
+    started = time.perf_counter()
+    orders = crud.get_orders_by_store(db, STORE_ID, limit)
+    queried = time.perf_counter()
+    page = TypeAdapter(schemas.Page[schemas.OrderOut]).validate_python(build_page(orders, limit))
+    body = json.dumps(jsonable_encoder(page)).encode()
+    return queried - started, time.perf_counter() - queried, body
+
+
+def fast_path(db: Session, limit: int):
+    started = time.perf_counter()
+    orders = order_rows.fetch_orders(db, models.Order.store_id == STORE_ID, limit=limit)
+    queried = time.perf_counter()
+    body = order_rows.OrderJSONResponse(order_rows.encode_page(orders, limit)).body
+    return queried - started, time.perf_counter() - queried, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        load(db, args.orders, args.items)
+
+    results = {}
+    for name, path in (("orm", orm_path), ("fast", fast_path)):
+        best = None
+        for _ in range(args.repeat):
+            with Session(engine) as db:   # fresh identity map, like a request
+                query_s, serialize_s, body = path(db, args.orders)
+            if best is None or query_s + serialize_s < sum(best[:2]):
+                best = (query_s, serialize_s, body)
+        results[name] = best
+        print(f"{name:5} query {best[0] * 1000:8.1f} ms   serialize {best[1] * 1000:8.1f} ms   "
+              f"total {(best[0] + best[1]) * 1000:8.1f} ms   {len(best[2]) / 1e6:.1f} MB")
+
+    same = json.loads(results["orm"][2]) == json.loads(results["fast"][2])
+    speedup = sum(results["orm"][:2]) / sum(results["fast"][:2])
+    print(f"speedup {speedup:.1f}x, identical JSON: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Order list pages: the old joined eager load against ?view=detail and ?view=summary.
+
+    python -m benchmarks.order_views --orders 10000 --items 5 --limit 500
+
+Loads a synthetic store (see order_serialization.load) into an in-memory SQLite database and,
+for one page of --limit orders, prints per strategy:
+
+* rows / cells  - result rows and values the database sent back, over every SELECT issued
+* response      - size of the JSON page
+* peak memory   - tracemalloc peak while querying and serializing the page
+
+joined is the former joinedload(Order.items).joinedload(OrderItem.product) query.
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.utils.pagination import build_page, keyset  # noqa: E402
+from app.utils.query_plan import capture_selects  # noqa: E402
+from benchmarks.order_serialization import STORE_ID, load  # noqa: E402
+
+
+def joined(db: Session, limit: int):
+    query = (
+        db.query(models.Order)
+        .options(joinedload(models.Order.items).joinedload(models.OrderItem.product))
+        .filter(models.Order.store_id == STORE_ID)
+    )
+    return schemas.Page[schemas.OrderOut].model_validate(build_page(keyset(query, models.Order.id, limit).all(), limit))
+
+
+def detail(db: Session, limit: int):
+    orders = crud.get_orders_by_store(db, STORE_ID, limit, view="detail")
+    return schemas.Page[schemas.OrderOut].model_validate(build_page(orders, limit))
+
+
+def summary(db: Session, limit: int):
+    orders = crud.get_orders_by_store(db, STORE_ID, limit, view="summary")
+    return schemas.Page[schemas.OrderSummary].model_validate(build_page(orders, limit))
+
+
+def transferred(engine, statements):
+    """Re-run the captured SELECTs and count the rows and values they return."""
+    rows = cells = 0
+    with engine.connect() as conn:
+        for statement, parameters in statements:
+            result = conn.exec_driver_sql(statement, parameters).fetchall()
+            rows += len(result)
+            cells += sum(len(row) for row in result)
+    return rows, cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=500)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        load(db, args.orders, args.items)
+
+    for name, strategy in (("joined", joined), ("detail", detail), ("summary", summary)):
+        with Session(engine) as db, capture_selects(engine) as statements:
+            tracemalloc.start()
+            started = time.perf_counter()
+            body = json.dumps(jsonable_encoder(strategy(db, args.limit))).encode()
+            elapsed = time.perf_counter() - started
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        rows, cells = transferred(engine, statements)
+        print(f"{name:8} rows {rows:6}  cells {cells:7}  response {len(body) / 1024:7.1f} KiB  "
+              f"peak memory {peak / 1024 / 1024:6.1f} MiB  {elapsed * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
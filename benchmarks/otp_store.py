@@ -0,0 +1,84 @@
+"""
+OTP issue + verify throughput per backend and thread count.
+
+    python -m benchmarks.otp_store --mobiles 5000 --threads 1 4 8 --backends memory db
+
+Each operation issues a code for a random mobile and verifies it (one wrong guess in ten),
+the same calls POST /auth/request-otp and /auth/verify-otp make. The db backend runs against
+DATABASE_URL, or a throw-away SQLite file when it is not set.
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'otp_bench.db')}")
+
+from app.config import settings  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.utils import otp_service  # noqa: E402
+
+
+def _worker(store, mobiles, ops: int, seed: int) -> int:
+    rng = random.Random(seed)
+    verified = 0
+    for _ in range(ops):
+        mobile = rng.choice(mobiles)
+        try:
+            code = otp_service.generate_otp("owner", mobile, store)
+        except otp_service.OTPRateLimited:
+            continue
+        guess = code if rng.random() >= 0.1 else "000000"
+        verified += otp_service.verify_otp("owner", mobile, guess, store)
+    return verified
+
+
+def run(backend: str, mobiles: int, ops: int, threads: int) -> dict:
+    if backend == "db":
+        Base.metadata.create_all(bind=engine)
+    store = otp_service.BACKENDS[backend]()
+    numbers = [f"9{n:09d}" for n in range(mobiles)]
+    per_thread = ops // threads
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        verified = sum(pool.map(_worker, [store] * threads, [numbers] * threads, [per_thread] * threads, range(threads)))
+    elapsed = time.perf_counter() - start
+    total = per_thread * threads
+    return {
+        "backend": backend,
+        "threads": threads,
+        "operations": total,
+        "verified": verified,
+        "seconds": round(elapsed, 3),
+        "ops_per_second": round(total / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(otp_service.BACKENDS), choices=list(otp_service.BACKENDS))
+    parser.add_argument("--mobiles", type=int, default=5000)
+    parser.add_argument("--ops", type=int, default=4000, help="issue+verify pairs per run")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    # the benchmark measures the store, not the limits
+    settings.OTP_MAX_REQUESTS = args.ops
+
+    results = []
+    for backend in args.backends:
+        for threads in sorted(set(args.threads)):
+            result = run(backend, args.mobiles, args.ops, threads)
+            results.append(result)
+            print(f"{backend:>6} {threads:>3} threads: {result['ops_per_second']:>9} ops/s ({result['seconds']}s)")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+RFM segmentation throughput on a synthetic order history.
+
+    python -m benchmarks.rfm_segmentation --orders 1000000 --customers 50000 --chunk 100000
+
+Feeds generated (customer_id, created_at, total) chunks through segmentation.aggregate and
+segmentation.score, the same path the customer_segments job runs after reading orders, and
+prints the time spent in each step and the resulting segment sizes.
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from app.utils import segmentation  # noqa: E402
+
+NOW = pd.Timestamp("2026-01-01")
+
+
+def synthetic_chunks(orders: int, customers: int, chunk: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    # a few heavy buyers and a long tail, like real order histories
+    weights = rng.pareto(1.5, customers) + 1
+    weights /= weights.sum()
+    for start in range(0, orders, chunk):
+        n = min(chunk, orders - start)
+        yield pd.DataFrame({
+            "customer_id": rng.choice(customers, size=n, p=weights) + 1,
+            "created_at": NOW - pd.to_timedelta(rng.integers(0, 730 * 24 * 3600, size=n), unit="s"),
+            "total": np.round(rng.gamma(2.0, 400.0, size=n), 2),
+        })
+
+
+def run(orders: int, customers: int, chunk: int) -> dict:
+    chunks = list(synthetic_chunks(orders, customers, chunk))   # generation is not timed
+    start = time.perf_counter()
+    agg = segmentation.aggregate(chunks)
+    aggregated = time.perf_counter()
+    scored = segmentation.score(agg, NOW.to_pydatetime())
+    done = time.perf_counter()
+    return {
+        "orders": orders,
+        "customers": int(len(scored)),
+        "chunk": chunk,
+        "aggregate_seconds": round(aggregated - start, 3),
+        "score_seconds": round(done - aggregated, 3),
+        "orders_per_second": round(orders / (done - start)),
+        "segments": {k: int(v) for k, v in scored["segment"].value_counts().items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--chunk", type=int, default=segmentation.CHUNK_SIZE)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    result = run(args.orders, args.customers, args.chunk)
+    print(f"{result['orders']} orders / {result['customers']} customers: "
+          f"aggregate {result['aggregate_seconds']}s, score {result['score_seconds']}s "
+          f"({result['orders_per_second']} orders/s)")
+    for name, count in sorted(result["segments"].items(), key=lambda kv: -kv[1]):
+        print(f"  {name:<10} {count}")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import os
+
+# app.database builds its engine at import time; keep tests off the .env database
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from app.database import Base, SessionLocal  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    """A session on a fresh in-memory SQLite database with every table created."""
+    # one shared connection, so EXPLAIN on engine.connect() sees the same database
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal(bind=engine)
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
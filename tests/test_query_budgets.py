@@ -0,0 +1,6 @@
+from app.utils.query_budget import ENDPOINT_BUDGETS, assert_within_budgets
+
+
+def test_endpoints_within_query_budgets():
+    assert ENDPOINT_BUDGETS
+    assert_within_budgets()
@@ -0,0 +1,6 @@
+from app.utils.query_plan import CRUD_READS, assert_no_full_scans
+
+
+def test_crud_reads_use_indexes(db):
+    assert CRUD_READS
+    assert_no_full_scans(db)